@@ -0,0 +1,149 @@
+"""
+CLI batch SLA — jalankan pipeline ESCORE → ONE ME → SLIK tanpa Streamlit,
+untuk banyak set file sekaligus (mis. folder extract bulanan) secara paralel.
+
+Contoh:
+    python sla_batch.py --dir extracts/ --out hasil/ --format parquet
+    python sla_batch.py --set jan/escore.xlsx jan/oneme.xlsx jan/slik.xlsx \\
+                        --set feb/escore.xlsx feb/oneme.xlsx feb/slik.xlsx --out hasil/
+
+Per set ditulis `<out>/<nama>/sla_per_appid.<fmt>` dan `summary_cabang.<fmt>`
+(plus `profile.jsonl` — waktu & memori per step — kalau pakai `--profile`).
+`--dir` mencari sub-folder yang berisi ketiga file dengan nama default.
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import sla_calendar
+from sla_engine import (
+    FILE_ESCORE, FILE_PS, FILE_SLIK, SHEET_ESCORE, SHEET_PS, SHEET_SLIK, ESCORE_COL, JOIN_POLICIES,
+    SLA_MODES, branch_summary, run_pipeline, sla_per_appid,
+)
+from sla_profile import log_lines, step
+
+FORMATS = ("parquet", "csv")
+
+
+def discover_sets(root):
+    """Sub-folder (dan root itu sendiri) yang berisi FILE_ESCORE, FILE_PS dan FILE_SLIK."""
+    sets = []
+    for d in [root] + sorted(os.path.join(root, n) for n in os.listdir(root)):
+        if not os.path.isdir(d):
+            continue
+        paths = [os.path.join(d, f) for f in (FILE_ESCORE, FILE_PS, FILE_SLIK)]
+        if all(os.path.exists(p) for p in paths):
+            name = os.path.basename(os.path.abspath(d)) or "root"
+            sets.append((name, *paths))
+    return sets
+
+
+def write_frame(df, path_no_ext, fmt):
+    if fmt == "parquet":
+        df.to_parquet(path_no_ext + ".parquet", index=False)
+    else:
+        df.to_csv(path_no_ext + ".csv", index=False)
+
+
+def process_set(name, escore_path, ps_path, slik_path, out_dir, fmt, sheets, escore_col, policy="all",
+                profile=False, sla_mode="wall", calendar=None, load_workers=1):
+    """Worker: satu set file → tulis hasil, return ringkasan jumlah per step."""
+    escore_sheet, ps_sheet, slik_sheet = sheets
+    prof = [] if profile else None
+    res = run_pipeline(escore_path, ps_path, slik_path,
+                       escore_sheet=escore_sheet, ps_sheet=ps_sheet, slik_sheet=slik_sheet,
+                       escore_col=escore_col, policy=policy, sla_mode=sla_mode, calendar=calendar,
+                       profile=prof, load_workers=load_workers)
+    target = os.path.join(out_dir, name)
+    os.makedirs(target, exist_ok=True)
+    per_appid = sla_per_appid(res["df_sla"])
+    with step(prof, f"export sla_per_appid.{fmt}") as p:
+        write_frame(per_appid.assign(SLA_Category=per_appid["SLA_Category"].astype(str)),
+                    os.path.join(target, "sla_per_appid"), fmt)
+        p["rows"] = len(per_appid)
+    with step(prof, f"export summary_cabang.{fmt}") as p:
+        summ = branch_summary(res["df_sla"])
+        write_frame(summ, os.path.join(target, "summary_cabang"), fmt)
+        p["rows"] = len(summ)
+    if profile:
+        with open(os.path.join(target, "profile.jsonl"), "w", encoding="utf-8") as f:
+            f.write(log_lines([{"set": name, **r} for r in prof]))
+    return res["counts"]
+
+
+def build_parser():
+    p = argparse.ArgumentParser(description="Hitung SLA Pre Screening → SLIK untuk banyak set file.")
+    p.add_argument("--set", dest="sets", nargs=3, action="append", default=[],
+                   metavar=("ESCORE", "ONEME", "SLIK"), help="satu set file input (boleh berulang)")
+    p.add_argument("--dir", dest="dirs", action="append", default=[],
+                   help="folder berisi sub-folder extract dengan nama file default (boleh berulang)")
+    p.add_argument("--out", required=True, help="folder output")
+    p.add_argument("--format", choices=FORMATS, default="parquet")
+    p.add_argument("--workers", type=int, default=None, help="jumlah proses (default: jumlah CPU)")
+    p.add_argument("--escore-sheet", default=SHEET_ESCORE)
+    p.add_argument("--ps-sheet", default=SHEET_PS)
+    p.add_argument("--slik-sheet", default=SHEET_SLIK)
+    p.add_argument("--escore-col", default=ESCORE_COL)
+    p.add_argument("--policy", choices=list(JOIN_POLICIES), default="all", help="kebijakan match SLIK")
+    p.add_argument("--profile", action="store_true", help="tulis waktu & memori per step ke profile.jsonl")
+    p.add_argument("--sla-mode", choices=list(SLA_MODES), default="wall", help="jam kalender atau jam kerja")
+    p.add_argument("--office-hours", default=f"{sla_calendar.OFFICE_OPEN}-{sla_calendar.OFFICE_CLOSE}",
+                   help="jam kantor untuk --sla-mode business, mis. 08:00-17:00")
+    p.add_argument("--weekmask", default=sla_calendar.WEEKMASK, help="hari kerja Senin…Minggu, mis. 1111100")
+    p.add_argument("--holidays", default=sla_calendar.HOLIDAYS_FILE, help="file CSV tanggal libur")
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    jobs = []
+    for i, (e, ps, sl) in enumerate(args.sets, start=1):
+        jobs.append((os.path.basename(os.path.dirname(os.path.abspath(ps))) or f"set{i}", e, ps, sl))
+    for d in args.dirs:
+        jobs.extend(discover_sets(d))
+    if not jobs:
+        print("Tidak ada set file. Pakai --set atau --dir.", file=sys.stderr)
+        return 2
+
+    # Nama output harus unik per set
+    seen = {}
+    for i, job in enumerate(jobs):
+        n = seen[job[0]] = seen.get(job[0], 0) + 1
+        if n > 1:
+            jobs[i] = (f"{job[0]}_{n}",) + job[1:]
+
+    sheets = (args.escore_sheet, args.ps_sheet, args.slik_sheet)
+    calendar = None
+    if args.sla_mode == "business":
+        open_time, _, close_time = args.office_hours.partition("-")
+        try:
+            calendar = sla_calendar.make_calendar(open_time, close_time, args.weekmask,
+                                                  sla_calendar.load_holidays(args.holidays))
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 2
+    # Banyak set → paralel antar set; satu set → ketiga workbook-nya yang di-parse paralel
+    load_workers = 3 if len(jobs) == 1 else 1
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futs = {
+            pool.submit(process_set, *job, args.out, args.format, sheets, args.escore_col,
+                        args.policy, args.profile, args.sla_mode, calendar, load_workers): job[0]
+            for job in jobs
+        }
+        for fut in as_completed(futs):
+            name = futs[fut]
+            try:
+                c = fut.result()
+            except Exception as e:
+                failed += 1
+                print(f"[GAGAL] {name}: {e}", file=sys.stderr)
+                continue
+            print(f"[OK] {name}: ESCORE {c['n_master']:,} → ONE ME {c['n_ps_filtered']:,} "
+                  f"→ SLIK match {c['n_match']:,} / tidak {c['n_nomatch']:,}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
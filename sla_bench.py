@@ -0,0 +1,287 @@
+"""
+Benchmark pipeline SLA dengan data sintetis.
+
+Generator membuat tiga workbook dengan nama kolom & sheet yang sama seperti
+extract asli (ESCORE "Sheet1", ONE ME "all raw", SLIK "Sheet1"), skala dan
+rasio APPID duplikat bisa diatur. Tiap stage diukur terpisah: wall time, CPU
+time, peak memori (tracemalloc) dan jumlah baris output. Timing dan memori
+diukur di dua pass terpisah, karena tracemalloc memperlambat parse openpyxl
+berkali-kali lipat. Hasil di-append ke file JSONL (satu baris per stage,
+lengkap dengan commit git) supaya regresi antar versi kelihatan lewat
+`--compare`.
+
+Contoh:
+    python sla_bench.py --rows 10000 100000 --dup 0.1
+    python sla_bench.py --rows 1000000 --policy first_after --no-mem
+    python sla_bench.py --compare
+
+Catatan: Excel sendiri hanya bisa membuka 1.048.576 baris per sheet; workbook
+yang lebih besar tetap bisa dibaca pipeline (openpyxl read_only), tapi
+generate-nya lama (ditulis baris per baris oleh openpyxl write_only).
+"""
+import argparse
+import datetime
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+import sla_export
+import sla_rollup
+import sla_sketch
+from sla_cache import CACHE_DIR_NAME
+from sla_engine import (
+    FILE_ESCORE, FILE_PS, FILE_SLIK, SHEET_ESCORE, SHEET_PS, SHEET_SLIK, ESCORE_COL, TIMEDONE_COL,
+    JOIN_POLICIES, compute_sla, filter_escore, filter_status, get_sheets, join_slik,
+    load_master_appids, load_ps, load_slik, sla_per_appid,
+)
+
+DATA_DIR     = ".sla_bench"
+RESULTS_FILE = "bench_results.jsonl"
+REGRESSION   = 1.2                # --compare menandai stage yang ≥ 20% lebih lambat
+
+PS_HEADER   = ["APPID", "NIP_USER", "USER_NAM", "STATUS", "CREATED_AT", "REASON", "CABANG", "PRODUK",
+               "NIP_CMO", "NAMA_COM", "PisahHarta", "namadealer", "FACT_HISTORICAL_ONE_ME.jenis_cluster",
+               "sales_type"]
+SLIK_HEADER = ["APPID", "MID", "CABANG", "NIK", "Product", "EngineScoring", "MOName", "HitBiroKredit",
+               "HitBiroKreditKonsumen", "Tanggal Hit SLIK", TIMEDONE_COL, "Flag", "DataEntryProced",
+               "StatusMa", "MaritalStatus", "Tanggal Hit SLIK.autoCalendar.YearMonth"]
+STATUSES    = ["CHECK_PRESCREENING_REQUEST", "CHECK_PRESCREENING_REQUEST_DENIED",
+               "CHECK_PRESCREENING_REQUEST_APPROVED"]
+STATUS_P    = [0.60, 0.26, 0.14]             # kira-kira proporsi di extract asli
+PRODUKS     = ["CS USED", "CS NEW", "DS", "KKB"]
+PRODUK_P    = [0.56, 0.38, 0.035, 0.025]
+N_CABANG    = 288
+
+# ─────────────────────────────────────────────
+# GENERATOR
+# ─────────────────────────────────────────────
+def _write_sheet(path, sheet, header, columns):
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(sheet)
+    ws.append(header)
+    for row in zip(*columns):
+        ws.append(row)
+    wb.save(path)
+
+
+def _py_dt(values):
+    """datetime64 → list datetime Python (NaT → None) untuk openpyxl."""
+    return [None if pd.isna(v) else v for v in pd.DatetimeIndex(values).to_pydatetime()]
+
+
+def generate(out_dir, rows, dup_ratio=0.1, seed=0, days=90, escore_frac=0.6, slik_frac=0.7):
+    """
+    Tulis FILE_ESCORE / FILE_PS / FILE_SLIK sintetis ke `out_dir`. `rows` =
+    jumlah baris ONE ME; `dup_ratio` = porsi baris ONE ME (dan SLIK) yang
+    APPID-nya duplikat. Return (escore_path, ps_path, slik_path).
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng      = np.random.default_rng(seed)
+    n_unique = max(1, int(round(rows * (1 - dup_ratio))))
+    unique   = 5_000_000 + np.arange(n_unique)
+    appid    = rng.permutation(np.r_[unique, rng.choice(unique, rows - n_unique)])
+
+    # ESCORE: sebagian APPID ONE ME + APPID yang tidak ada di ONE ME
+    master = np.r_[rng.choice(unique, int(n_unique * escore_frac), replace=False),
+                   unique[-1] + 1 + np.arange(int(n_unique * 0.1))]
+    _write_sheet(os.path.join(out_dir, FILE_ESCORE), SHEET_ESCORE, [ESCORE_COL],
+                 [rng.permutation(master).tolist()])
+
+    t0      = np.datetime64("2026-01-01T00:00:00", "ms")
+    created = t0 + rng.integers(0, days * 86_400_000, rows).astype("timedelta64[ms]")
+    status  = rng.choice(STATUSES, rows, p=STATUS_P)
+    cabang  = np.array([f"CABANG {i:03d}" for i in range(N_CABANG)])[rng.integers(0, N_CABANG, rows)]
+    produk  = rng.choice(PRODUKS, rows, p=PRODUK_P)
+    user    = np.char.add("User ", (appid % 5000).astype(str))
+    nip     = (20_200_000 + appid % 5000).astype(str)
+    blank   = ["-"] * rows
+    _write_sheet(os.path.join(out_dir, FILE_PS), SHEET_PS, PS_HEADER, [
+        appid.tolist(), nip.tolist(), user.tolist(), status.tolist(), _py_dt(created), [None] * rows,
+        cabang.tolist(), produk.tolist(), nip.tolist(), user.tolist(), ["Tidak"] * rows, blank, blank, blank,
+    ])
+
+    # SLIK: hit untuk sebagian APPID yang APPROVED/DENIED, sebagian APPID di-hit lebih dari sekali
+    ok       = status != STATUSES[0]
+    first    = pd.Series(created[ok]).groupby(appid[ok]).min()
+    hit_ids  = rng.choice(first.index.to_numpy(), int(len(first) * slik_frac), replace=False)
+    n_dup    = int(len(hit_ids) * dup_ratio / max(1e-9, 1 - dup_ratio))
+    s_appid  = rng.permutation(np.r_[hit_ids, rng.choice(hit_ids, n_dup)]) if len(hit_ids) else hit_ids
+    n_slik   = len(s_appid)
+    base     = first.reindex(s_appid).to_numpy().astype("datetime64[ms]")
+    wait_ms  = (rng.lognormal(np.log(10 * 60_000), 1.2, n_slik)).astype(np.int64)
+    hit      = base + wait_ms.astype("timedelta64[ms]")
+    done     = hit + rng.integers(60_000, 15 * 60_000, n_slik).astype("timedelta64[ms]")
+    done_py  = _py_dt(done)
+    for i in np.flatnonzero(rng.random(n_slik) < 0.02):   # Timedone kosong ditulis "-" seperti extract asli
+        done_py[i] = "-"
+    s_blank  = ["-"] * n_slik
+    _write_sheet(os.path.join(out_dir, FILE_SLIK), SHEET_SLIK, SLIK_HEADER, [
+        s_appid.tolist(), (7_000_000 + np.arange(n_slik)).astype(str).tolist(),
+        cabang[rng.integers(0, rows, n_slik)].tolist(), s_blank, ["CS Used"] * n_slik, ["Reguler 1"] * n_slik,
+        s_blank, [None] * n_slik, [None] * n_slik, _py_dt(hit), done_py, ["Success"] * n_slik,
+        _py_dt(done), ["Final Approved"] * n_slik, ["Married"] * n_slik, ["2026-Jan"] * n_slik,
+    ])
+    return tuple(os.path.join(out_dir, f) for f in (FILE_ESCORE, FILE_PS, FILE_SLIK))
+
+
+def dataset(rows, dup_ratio, seed=0, root=DATA_DIR):
+    """Path dataset sintetis untuk parameter ini; di-generate sekali lalu dipakai ulang."""
+    d = os.path.join(root, f"rows{rows}_dup{dup_ratio:g}_seed{seed}")
+    paths = tuple(os.path.join(d, f) for f in (FILE_ESCORE, FILE_PS, FILE_SLIK))
+    if not all(os.path.exists(p) for p in paths):
+        print(f"generate {d} …", file=sys.stderr)
+        generate(d, rows, dup_ratio, seed)
+    return paths
+
+# ─────────────────────────────────────────────
+# PROFILER
+# ─────────────────────────────────────────────
+def measure(fn, mem=True):
+    """Jalankan fn() → (hasil, {wall_s, cpu_s, peak_mb})."""
+    if mem:
+        tracemalloc.start()
+    w0, c0 = time.perf_counter(), time.process_time()
+    out = fn()
+    stat = {"wall_s": round(time.perf_counter() - w0, 4), "cpu_s": round(time.process_time() - c0, 4)}
+    if mem:
+        stat["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        tracemalloc.stop()
+    return out, stat
+
+
+def _n(x):
+    if isinstance(x, tuple):
+        x = x[0]
+    return len(x) if hasattr(x, "__len__") else None
+
+
+def _export_csv(df):
+    # CSV lewat sla_export per chunk; isinya langsung dibuang, yang diukur cuma biaya encode
+    return sum(len(chunk) for chunk in sla_export.iter_csv(df))
+
+
+def _aggregate(df_sla):
+    cube   = sla_rollup.build_cube(df_sla)
+    sketch = sla_sketch.build(df_sla)
+    sla_rollup.summary(cube, "CABANG", sla_sketch.quantiles(sketch, ["CABANG"]))
+    sla_rollup.histogram(sla_rollup.build_hist(df_sla))
+    sla_rollup.trend(cube)
+    return cube
+
+
+def bench_stages(escore_path, ps_path, slik_path, policy="all", mem=True):
+    """Ukur tiap stage pipeline berurutan (cache kolumnar dihapus dulu → parse dingin)."""
+    shutil.rmtree(os.path.join(os.path.dirname(os.path.abspath(ps_path)), CACHE_DIR_NAME), ignore_errors=True)
+    res = {}
+
+    def run(stage, fn):
+        out, stat = measure(fn, mem)
+        res[stage] = {**stat, "rows_out": _n(out)}
+        return out
+
+    run("sheets",        lambda: [get_sheets(p) for p in (escore_path, ps_path, slik_path)])
+    master  = run("parse_escore", lambda: load_master_appids(escore_path, SHEET_ESCORE, ESCORE_COL))
+    # Pipeline mem-push filter ESCORE ke scan (parse_ps). Biaya filternya sendiri
+    # diukur terpisah: parse tanpa filter (parse_ps_all) → filter_escore di frame penuh
+    ps_all  = run("parse_ps_all", lambda: load_ps(ps_path, SHEET_PS))
+    run("parse_ps",      lambda: load_ps(ps_path, SHEET_PS, master))
+    slik    = run("parse_slik",   lambda: load_slik(slik_path, SHEET_SLIK))
+    run("parse_cached",  lambda: (load_master_appids(escore_path, SHEET_ESCORE, ESCORE_COL),
+                                  load_ps(ps_path, SHEET_PS, master), load_slik(slik_path, SHEET_SLIK)))
+    ps_esc  = run("filter_escore", lambda: filter_escore(ps_all, master))
+    ps, _   = run("filter_status", lambda: filter_status(ps_esc))
+    joined  = run("join",          lambda: join_slik(ps, slik, policy))
+    df      = run("sla",           lambda: compute_sla(joined))
+    df_sla  = df[df["_slik_found"]]
+    run("aggregate",     lambda: _aggregate(df_sla))
+    run("export_csv",    lambda: _export_csv(sla_per_appid(df_sla)))
+    return res
+
+# ─────────────────────────────────────────────
+# HASIL
+# ─────────────────────────────────────────────
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or "-"
+    except OSError:
+        return "-"
+
+
+def save_results(path, records):
+    with open(path, "a", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r) + "\n")
+
+
+def compare(path, threshold=REGRESSION):
+    """Bandingkan run terakhir tiap (rows, dup, policy, stage) dengan commit sebelumnya."""
+    runs = defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            r = json.loads(line)
+            runs[(r["rows"], r["dup_ratio"], r["policy"], r["stage"])].append(r)
+    lines = []
+    for key, rs in sorted(runs.items(), key=lambda kv: (kv[0][:3], kv[1][0]["ts"])):
+        cur  = rs[-1]
+        prev = next((r for r in reversed(rs[:-1]) if r["commit"] != cur["commit"]), None)
+        if prev is None or not prev["wall_s"]:
+            continue
+        ratio = cur["wall_s"] / prev["wall_s"]
+        flag  = "  ← REGRESI" if ratio >= threshold else ""
+        lines.append(f"{key[0]:>10,} dup={key[1]:<4g} {key[2]:<11} {key[3]:<14} "
+                     f"{prev['commit']}→{cur['commit']}  {prev['wall_s']:.3f}s → {cur['wall_s']:.3f}s "
+                     f"(×{ratio:.2f}){flag}")
+    return lines
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark pipeline SLA dengan data sintetis.")
+    ap.add_argument("--rows", nargs="+", type=int, default=[10_000], help="Jumlah baris ONE ME (boleh banyak)")
+    ap.add_argument("--dup", type=float, default=0.1, help="Rasio baris dengan APPID duplikat (0–1)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--policy", choices=list(JOIN_POLICIES), default="all")
+    ap.add_argument("--data-dir", default=DATA_DIR, help="Folder dataset sintetis")
+    ap.add_argument("--out", default=RESULTS_FILE, help="File JSONL hasil (di-append)")
+    ap.add_argument("--no-mem", action="store_true", help="Lewati pass memori (tracemalloc)")
+    ap.add_argument("--compare", action="store_true", help="Bandingkan hasil di --out antar commit, lalu keluar")
+    args = ap.parse_args(argv)
+
+    if args.compare:
+        if not os.path.exists(args.out):
+            print(f"Belum ada hasil di {args.out}", file=sys.stderr)
+            return 1
+        print("\n".join(compare(args.out)) or "Belum ada dua commit berbeda untuk dibandingkan.")
+        return 0
+    if not 0 <= args.dup < 1:
+        ap.error("--dup harus di antara 0 dan 1")
+
+    commit, ts = git_commit(), datetime.datetime.now().isoformat(timespec="seconds")
+    for rows in args.rows:
+        paths = dataset(rows, args.dup, args.seed, args.data_dir)
+        res   = bench_stages(*paths, policy=args.policy, mem=False)
+        if not args.no_mem:
+            for stage, stat in bench_stages(*paths, policy=args.policy, mem=True).items():
+                res[stage]["peak_mb"] = stat["peak_mb"]
+        records = [{"ts": ts, "commit": commit, "rows": rows, "dup_ratio": args.dup, "policy": args.policy,
+                    "stage": stage, **stat} for stage, stat in res.items()]
+        save_results(args.out, records)
+        print(f"\n── {rows:,} baris · dup {args.dup:g} · {args.policy} ──")
+        for r in records:
+            mem = f"{r['peak_mb']:>9.1f} MB" if "peak_mb" in r else ""
+            n   = f"{r['rows_out']:>12,}" if r["rows_out"] is not None else " " * 12
+            print(f"  {r['stage']:<14} {r['wall_s']:>9.3f}s  cpu {r['cpu_s']:>9.3f}s {mem}  {n}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Cache kolumnar untuk sheet Excel input dashboard SLA.
+
+Tiap (file, sheet) di-parse sekali pakai pandas/openpyxl lalu disimpan sebagai
+Arrow IPC (Feather, tanpa kompresi) di folder `.sla_cache/` di sebelah file
+sumber. Load berikutnya langsung memory-map file cache. Key cache = path,
+sheet, size, mtime dan hash isi file, jadi cache otomatis dibangun ulang kalau
+file sumber berubah.
+"""
+import datetime
+import glob
+import hashlib
+import json
+import os
+import re
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+CACHE_DIR_NAME = ".sla_cache"
+CACHE_VERSION  = 1
+_HASH_CHUNK    = 1 << 20
+
+# (abspath, size, mtime_ns) → sha256, supaya file yang sama tidak di-hash ulang tiap rerun
+_hash_memo = {}
+
+
+def file_fingerprint(path):
+    """Fingerprint file sumber: path absolut, size, mtime dan sha256 isi file."""
+    ap = os.path.abspath(path)
+    st = os.stat(ap)
+    memo_key = (ap, st.st_size, st.st_mtime_ns)
+    digest = _hash_memo.get(memo_key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(ap, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        _hash_memo[memo_key] = digest
+    return {"path": ap, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+
+
+def set_digest(values):
+    """Hash stabil untuk himpunan nilai (mis. master APPID) — dipakai sebagai bagian key cache."""
+    if values is None:
+        return "all"
+    h = hashlib.sha256()
+    for v in sorted(values):
+        h.update(f"{v},".encode())
+    return h.hexdigest()[:20]
+
+
+def _slug(s):
+    return re.sub(r"[^0-9A-Za-z]+", "_", str(s)).strip("_") or "sheet"
+
+
+def cache_path(path, sheet_name, fingerprint=None, variant="", slot=None):
+    """
+    Lokasi file cache untuk (path, sheet). `variant` membedakan proyeksi/filter
+    berbeda; `slot` (default = variant) = proyeksi tanpa bagian filter. Per
+    (file, sheet, slot) cuma satu file yang disimpan — lihat store_cached.
+    """
+    fp  = fingerprint or file_fingerprint(path)
+    raw = "|".join(str(x) for x in (
+        CACHE_VERSION, fp["path"], sheet_name, fp["size"], fp["mtime_ns"], fp["sha256"], variant,
+    ))
+    key = hashlib.sha256(raw.encode()).hexdigest()[:20]
+    tag = hashlib.sha256(str(variant if slot is None else slot).encode()).hexdigest()[:8]
+    d   = os.path.join(os.path.dirname(fp["path"]), CACHE_DIR_NAME)
+    return os.path.join(d, f"{_cache_prefix(fp['path'], sheet_name)}{tag}_{fp['sha256'][:12]}_{key}.feather")
+
+
+def _cache_prefix(abspath, sheet_name):
+    return f"{_slug(os.path.basename(abspath))}__{_slug(sheet_name)}__"
+
+
+def _to_text(v):
+    # Format datetime seragam (selalu dengan mikrodetik) supaya parse_dt tetap konsisten
+    if isinstance(v, datetime.datetime):
+        return v.isoformat(sep=" ", timespec="microseconds")
+    return str(v)
+
+
+def arrow_safe(df):
+    """Kolom object campuran (mis. datetime + string) tidak bisa masuk Arrow → jadikan string."""
+    df.columns = [str(c) for c in df.columns]
+    for c in df.columns:
+        if df[c].dtype == object:
+            try:
+                pa.array(df[c], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                df[c] = df[c].where(df[c].isna(), df[c].map(_to_text))
+    return df
+
+
+def load_cached(cpath, columns=None):
+    """Baca file cache (memory-mapped). Return None kalau belum ada / rusak."""
+    if not os.path.exists(cpath):
+        return None
+    try:
+        table = feather.read_table(cpath, memory_map=True)
+    except (OSError, pa.ArrowInvalid):
+        return None
+    attrs = json.loads((table.schema.metadata or {}).get(b"sla_attrs", b"{}"))
+    if columns is not None:
+        table = table.select([c for c in columns if c in table.column_names])
+    df = table.to_pandas()
+    df.attrs.update(attrs)
+    return df
+
+
+def _is_stale(name, prefix, tag, sha):
+    """File cache `name` (nama basename) basi kalau isi sumbernya beda, atau slot-nya sama (filter lain)."""
+    parts = name[len(prefix):-len(".feather")].split("_")
+    if len(parts) != 3:                 # format nama lama (sebelum ada slot)
+        return True
+    return parts[1] != sha or parts[0] == tag
+
+
+def store_cached(df, cpath, sheet_name, source_path, fingerprint=None):
+    """
+    Simpan df ke cache secara atomic. Yang dibuang dari (file, sheet) yang sama:
+    cache dari isi file versi lama, dan variant lain di slot yang sama (mis.
+    ONE ME dengan master APPID lama) — jadi per slot tidak menumpuk.
+    """
+    try:
+        os.makedirs(os.path.dirname(cpath), exist_ok=True)
+        fp     = fingerprint or file_fingerprint(source_path)
+        prefix = _cache_prefix(fp["path"], sheet_name)
+        name   = os.path.basename(cpath)
+        tag    = name[len(prefix):].split("_")[0]
+        for old in glob.glob(os.path.join(os.path.dirname(cpath), glob.escape(prefix) + "*.feather")):
+            base = os.path.basename(old)
+            if base != name and _is_stale(base, prefix, tag, fp["sha256"][:12]):
+                os.remove(old)
+        tmp = f"{cpath}.{os.getpid()}.tmp"
+        table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+        table = table.replace_schema_metadata({
+            **(table.schema.metadata or {}), b"sla_attrs": json.dumps(df.attrs).encode(),
+        })
+        feather.write_feather(table, tmp, compression="uncompressed")
+        os.replace(tmp, cpath)
+    except OSError:
+        # Folder read-only dsb — cache cuma optimasi, jangan gagalkan load
+        pass
+
+
+def is_cached(path, sheet_name, variant="", slot=None):
+    """True kalau cache (path, sheet, variant) untuk versi file saat ini sudah ada di disk."""
+    return os.path.exists(cache_path(path, sheet_name, file_fingerprint(path), variant, slot))
+
+
+def cached_frame(path, sheet_name, build, variant="", slot=None):
+    """
+    Ambil df hasil `build()` untuk (path, sheet, variant) dari cache, atau bangun
+    lalu simpan. `df.attrs` (harus JSON-able) ikut disimpan. `slot`: lihat cache_path.
+    """
+    fp    = file_fingerprint(path)
+    cpath = cache_path(path, sheet_name, fp, variant, slot)
+    df    = load_cached(cpath)
+    if df is not None:
+        return df
+
+    df = arrow_safe(build())
+    store_cached(df, cpath, sheet_name, path, fp)
+    return df
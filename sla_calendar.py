@@ -0,0 +1,87 @@
+"""
+Kalender kerja untuk SLA dalam jam kerja (bukan jam kalender).
+
+Jam kerja antara dua timestamp = jam_kerja(selesai) − jam_kerja(mulai), dengan
+jam_kerja(t) = jumlah hari kerja sebelum hari t × panjang hari kerja + bagian
+jam kantor yang sudah lewat di hari t (di-clip ke jam buka–tutup, 0 kalau hari
+t libur/akhir pekan). Semua lewat np.busday_count / np.is_busday, jadi
+vectorized untuk jutaan baris — tidak ada loop Python per baris.
+
+File libur: CSV/TXT, kolom pertama = tanggal (YYYY-MM-DD), kolom lain bebas
+(mis. keterangan). Baris yang diawali '#' dan baris yang tanggalnya tidak
+terbaca (header) dilewati. Contoh:
+
+    tanggal,keterangan
+    2026-01-01,Tahun Baru Masehi
+    2026-01-16,Isra Mikraj
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+HOLIDAYS_FILE = "libur_nasional.csv"
+OFFICE_OPEN   = "08:00"
+OFFICE_CLOSE  = "17:00"
+WEEKMASK      = "1111100"             # Senin … Minggu; 1 = hari kerja
+DAY_NAMES     = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
+
+
+def parse_hhmm(s):
+    """'08:30' → 8.5 (jam desimal)."""
+    h, _, m = str(s).partition(":")
+    return int(h) + int(m or 0) / 60
+
+
+def load_holidays(path):
+    """Tanggal libur dari file lokal → array datetime64[D] unik & urut. File tidak ada → kosong."""
+    if not path or not os.path.exists(path):
+        return np.array([], dtype="datetime64[D]")
+    raw = pd.read_csv(path, header=None, comment="#", usecols=[0], dtype=str, skipinitialspace=True)
+    days = pd.to_datetime(raw[0].str.strip(), format="%Y-%m-%d", errors="coerce").dropna()
+    return np.unique(days.to_numpy().astype("datetime64[D]"))
+
+
+def make_calendar(open_time=OFFICE_OPEN, close_time=OFFICE_CLOSE, weekmask=WEEKMASK, holidays=()):
+    """Kalender kerja (dict): jam buka/tutup (jam desimal), weekmask dan tanggal libur."""
+    open_h, close_h = parse_hhmm(open_time), parse_hhmm(close_time)
+    if not 0 <= open_h < close_h <= 24:
+        raise ValueError(f"Jam kantor tidak valid: {open_time}–{close_time}")
+    if len(weekmask) != 7 or set(weekmask) - {"0", "1"} or "1" not in weekmask:
+        raise ValueError(f"Weekmask tidak valid: {weekmask!r} (7 karakter 0/1, Senin dulu)")
+    return {
+        "open":     open_h,
+        "close":    close_h,
+        "weekmask": weekmask,
+        "holidays": np.asarray(holidays, dtype="datetime64[D]"),
+    }
+
+
+def _busdaycal(cal):
+    return np.busdaycalendar(weekmask=cal["weekmask"], holidays=cal["holidays"])
+
+
+def _clock(t, cal, bdc, anchor):
+    """Jam kerja kumulatif dari `anchor` sampai t (t: datetime64[ns] tanpa NaT)."""
+    day  = t.astype("datetime64[D]")
+    tod  = (t - day).astype("timedelta64[s]").astype(np.int64) / 3600
+    part = np.clip(tod, cal["open"], cal["close"]) - cal["open"]
+    full = np.busday_count(anchor, day, busdaycal=bdc)
+    return full * (cal["close"] - cal["open"]) + np.where(np.is_busday(day, busdaycal=bdc), part, 0.0)
+
+
+def business_hours(start, end, cal):
+    """
+    Jam kerja dari `start` ke `end` (Series/array datetime64) per elemen.
+    NaT → NaN; end < start → negatif (sama seperti SLA jam kalender).
+    """
+    s = np.asarray(start, dtype="datetime64[ns]")
+    e = np.asarray(end, dtype="datetime64[ns]")
+    ok  = ~(np.isnat(s) | np.isnat(e))
+    out = np.full(s.shape, np.nan)
+    if ok.any():
+        s, e   = s[ok], e[ok]
+        anchor = min(s.min(), e.min()).astype("datetime64[D]")
+        bdc    = _busdaycal(cal)
+        out[ok] = _clock(e, cal, bdc, anchor) - _clock(s, cal, bdc, anchor)
+    return out
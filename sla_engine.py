@@ -0,0 +1,417 @@
+"""
+Engine SLA Pre Screening → SLIK tanpa dependensi Streamlit.
+
+Alur: ESCORE (master APPID) → ONE ME (filter APPID + STATUS APPROVED/DENIED)
+→ LEFT JOIN SLIK → SLA = Timedone Hit SLIK − CREATED_AT.
+
+Dipakai oleh dashboard (`sla_slik.py`, lewat wrapper st.cache_data) dan CLI
+batch (`sla_batch.py`).
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from sla_cache import cached_frame, is_cached, set_digest
+from sla_calendar import business_hours, make_calendar
+from sla_profile import step
+from sla_reader import read_columns, sheet_names
+
+# ─────────────────────────────────────────────
+# CONFIG
+# ─────────────────────────────────────────────
+FILE_ESCORE = "APPID ONE ME PRESCREEN ESCORE.xlsx"
+FILE_PS     = "ONE ME PRE SCREENING.xlsx"
+FILE_SLIK   = "SLIK.xlsx"
+SHEET_ESCORE    = "Sheet1"
+SHEET_PS        = "all raw"
+SHEET_SLIK      = "Sheet1"
+ESCORE_COL      = "APPID_ONEME_PRESCREEN"
+TIMEDONE_COL    = "Timedone Hit SLIK"
+
+# Kolom yang benar-benar dipakai dashboard — sisanya tidak dibaca dari workbook
+PS_COLUMNS      = ["APPID", "USER_NAM", "STATUS", "CREATED_AT", "CABANG", "PRODUK"]
+SLIK_COLUMNS    = ["APPID", "Tanggal Hit SLIK", TIMEDONE_COL]
+
+# Kolom output "SLA per APPID" (tab 1 dashboard & export CLI)
+SLA_COLUMNS     = ["APPID", "USER_NAM", "CREATED_AT", "CABANG", "PRODUK", TIMEDONE_COL,
+                   "SLA_Display", "SLA_Hours", "SLA_Category"]
+
+# Kebijakan match ONE ME × SLIK (STEP 3)
+JOIN_POLICIES = {
+    "all":         "Semua pasangan (tanpa dedup)",
+    "first_after": "Hit SLIK pertama setelah CREATED_AT",
+    "min_sla":     "SLA terkecil per APPID",
+    "latest":      "Hit SLIK terakhir per APPID",
+}
+
+# Cara hitung SLA (STEP 4)
+SLA_MODES = {
+    "wall":     "Jam kalender (CREATED_AT → Timedone)",
+    "business": "Jam kerja (jam kantor, tanpa akhir pekan & libur)",
+}
+
+# Skema kolom setelah load: teks berulang → category, APPID → Int64 (nullable),
+# waktu → datetime64. Dipasang di ingest, jadi cache kolumnar & stage Streamlit
+# menyimpan bentuk ringkas ini.
+SCHEMA = {
+    "APPID":            "Int64",
+    "USER_NAM":         "category",
+    "STATUS":           "category",
+    "CABANG":           "category",
+    "PRODUK":           "category",
+    "CREATED_AT":       "datetime64[ns]",
+    "Tanggal Hit SLIK": "datetime64[ns]",
+    TIMEDONE_COL:       "datetime64[ns]",
+}
+
+SLA_ORDER  = ["≤ 1 Jam", "1–3 Jam", "3–6 Jam", "6–24 Jam", "> 24 Jam", "No Data"]
+SLA_BINS   = [-np.inf, 1, 3, 6, 24, np.inf]   # batas kanan inklusif → label SLA_ORDER[:-1]
+
+# ─────────────────────────────────────────────
+# HELPERS
+# ─────────────────────────────────────────────
+def sla_category(hours):
+    """Series jam → Categorical (urutan SLA_ORDER); NaN → 'No Data'."""
+    cat = pd.cut(hours, bins=SLA_BINS, labels=SLA_ORDER[:-1], right=True)
+    return cat.cat.add_categories("No Data").fillna("No Data")
+
+
+def parse_dt(s):
+    return pd.to_datetime(s, infer_datetime_format=True, errors="coerce")
+
+
+def fmt_sla(hours):
+    """Format jam desimal → '5 jam 32 menit'"""
+    if pd.isna(hours) or hours < 0:
+        return "-"
+    total_min = int(round(hours * 60))
+    h = total_min // 60
+    m = total_min % 60
+    if h == 0:
+        return f"{m} menit"
+    elif m == 0:
+        return f"{h} jam"
+    else:
+        return f"{h} jam {m} menit"
+
+
+def fmt_sla_series(hours):
+    """
+    Versi vectorized fmt_sla untuk satu Series — teks identik per elemen, tapi
+    hasilnya Categorical: string dibuat sekali per nilai unik, bukan per baris.
+    """
+    codes, uniq = pd.factorize(hours)
+    u     = pd.Series(uniq, dtype=float)
+    valid = u.notna() & (u >= 0)
+    total = np.rint(u.where(valid, 0) * 60).astype(np.int64)
+    h, m  = total // 60, total % 60
+    hs, ms = h.astype(str), m.astype(str)
+    out = np.where(h == 0, ms + " menit",
+          np.where(m == 0, hs + " jam", hs + " jam " + ms + " menit"))
+    labels = np.append(np.where(valid, out, "-"), "-")          # slot terakhir = NaN (code -1)
+    cats, inv = np.unique(labels, return_inverse=True)
+    return pd.Series(pd.Categorical.from_codes(inv[codes], cats), index=hours.index)
+
+
+def to_appid(s):
+    return pd.to_numeric(s, errors="coerce")
+
+
+def apply_schema(df, schema=SCHEMA):
+    """Cast kolom yang ada di `schema` (in place). Teks campuran angka/string jadi string dulu."""
+    for c, dtype in schema.items():
+        if c not in df.columns or df[c].dtype == dtype:
+            continue
+        s = df[c]
+        if dtype == "category" and s.dtype == object:
+            s = s.where(s.isna(), s.astype(str))
+        elif dtype == "Int64":
+            s = to_appid(s)
+        df[c] = s.astype(dtype)
+    return df
+
+# ─────────────────────────────────────────────
+# PIPELINE STAGES
+# ─────────────────────────────────────────────
+def get_sheets(path):
+    # Cukup baca manifest xl/workbook.xml di zip — workbook tidak di-load
+    try:
+        return sheet_names(path)
+    except: return []
+
+
+# Variant cache Arrow per loader (lihat sla_cache.cached_frame)
+def _escore_variant(col):
+    return f"cols={col}"
+
+def _ps_variant(master_appids):
+    return "cols=" + ",".join(PS_COLUMNS) + "|keep=" + set_digest(master_appids) + "|schema"
+
+def _ps_slot(master_appids):
+    # Master APPID baru → cache ONE ME dengan master lama dibuang (slot sama);
+    # versi tanpa filter (store incremental) punya slot sendiri
+    return "cols=" + ",".join(PS_COLUMNS) + "|keep=" + ("all" if master_appids is None else "master") + "|schema"
+
+SLIK_VARIANT = "cols=" + ",".join(SLIK_COLUMNS) + "|schema"
+
+
+def load_master_appids(path, sheet, col):
+    df_escore = cached_frame(path, sheet, lambda: read_columns(path, sheet, [col]), variant=_escore_variant(col))
+    return frozenset(to_appid(df_escore[col]).dropna().astype(int))
+
+
+def load_ps(path, sheet, master_appids=None):
+    # Filter ESCORE di-push ke scan: baris di luar master APPID tidak pernah disimpan.
+    # df.attrs["n_rows"] = total baris file ONE ME (sebelum filter)
+    return cached_frame(
+        path, sheet,
+        lambda: apply_schema(read_columns(path, sheet, PS_COLUMNS, required=["APPID", "CREATED_AT"],
+                                          key="APPID", keep=master_appids,
+                                          converters={"APPID": to_appid, "CREATED_AT": parse_dt})),
+        variant=_ps_variant(master_appids), slot=_ps_slot(master_appids),
+    )
+
+
+def load_slik(path, sheet):
+    return cached_frame(
+        path, sheet,
+        lambda: apply_schema(read_columns(path, sheet, SLIK_COLUMNS, required=["APPID", TIMEDONE_COL],
+                                          converters={"APPID": to_appid, "Tanggal Hit SLIK": parse_dt,
+                                                      TIMEDONE_COL: parse_dt})),
+        variant=SLIK_VARIANT,
+    )
+
+
+def _warm(loader, *args):
+    """Worker preload: parse ke cache Arrow di disk; frame-nya sendiri tidak dikirim balik."""
+    loader(*args)
+
+
+def preload(escore_path, ps_path, slik_path,
+            escore_sheet=SHEET_ESCORE, ps_sheet=SHEET_PS, slik_sheet=SHEET_SLIK,
+            escore_col=ESCORE_COL, workers=3):
+    """
+    Parse workbook yang cache-nya belum ada secara paralel di process pool,
+    supaya cold start ≈ file paling lambat, bukan jumlah ketiganya.
+
+    Worker menulis hasil ke cache Arrow (sla_cache); load_* berikutnya membaca
+    file itu lewat memory-map, jadi frame tidak di-pickle balik antar proses.
+    ONE ME butuh master APPID (filter di-push ke scan), jadi disubmit begitu
+    ESCORE selesai; SLIK jalan paralel dengan keduanya. Kalau cuma ≤ 1 file
+    yang perlu di-parse, atau pool gagal start, tidak ada yang dilakukan — load
+    biasa (serial) yang jalan. Error parse juga dibiarkan muncul lagi di load
+    biasa supaya ditangani di tempat yang sama seperti sebelumnya.
+    """
+    try:
+        escore_cold = not is_cached(escore_path, escore_sheet, _escore_variant(escore_col))
+        slik_cold   = not is_cached(slik_path, slik_sheet, SLIK_VARIANT)
+        master      = None if escore_cold else load_master_appids(escore_path, escore_sheet, escore_col)
+        ps_cold     = escore_cold or not is_cached(ps_path, ps_sheet, _ps_variant(master), _ps_slot(master))
+    except OSError:
+        return
+    workers = min(workers, os.cpu_count() or 1)
+    if workers < 2 or escore_cold + ps_cold + slik_cold < 2:
+        return
+    try:
+        # spawn: aman dipanggil dari proses yang punya banyak thread (server Streamlit)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futs = [pool.submit(_warm, load_slik, slik_path, slik_sheet)] if slik_cold else []
+            if escore_cold:
+                master = pool.submit(load_master_appids, escore_path, escore_sheet, escore_col).result()
+            if ps_cold:
+                futs.append(pool.submit(_warm, load_ps, ps_path, ps_sheet, master))
+            for f in futs:
+                f.exception()
+    except Exception:
+        # Pool gagal start, kolom/sheet tidak ada dsb — biar load biasa yang jalan
+        # (dan raise dengan pesan yang sama seperti tanpa preload)
+        return
+
+
+# Filter di bawah tidak membuat frame baru kalau tidak ada baris yang dibuang
+# (frame input dikembalikan apa adanya), dan tidak ada .copy() tambahan per step.
+def filter_escore(df_ps_raw, master_appids):
+    # Filter 1: hanya APPID yang ada di master ESCORE. load_ps biasanya sudah
+    # mem-push filter ini ke scan → semua lolos, frame input dipakai langsung
+    keep = df_ps_raw["APPID"].isin(master_appids)
+    return df_ps_raw if keep.all() else df_ps_raw[keep]
+
+
+def status_ok(status):
+    """Mask STATUS yang mengandung APPROVED atau DENIED."""
+    if isinstance(status.dtype, pd.CategoricalDtype):
+        # Regex cukup sekali per kategori, lalu dipetakan balik lewat codes
+        ok = np.append(status_ok(pd.Series(status.cat.categories)).to_numpy(), False)
+        return pd.Series(ok[status.cat.codes.to_numpy()], index=status.index)
+    status_clean = status.astype(str).str.strip().str.upper()
+    return status_clean.str.contains("APPROVED|DENIED", na=False)
+
+
+def filter_status(df_ps_escore):
+    # Filter 2: status APPROVED atau DENIED
+    if "STATUS" in df_ps_escore.columns:
+        mask_status  = status_ok(df_ps_escore["STATUS"])
+        df_ps        = df_ps_escore if mask_status.all() else df_ps_escore[mask_status]
+    else:
+        df_ps = df_ps_escore
+    all_status = df_ps_escore["STATUS"].dropna().unique().tolist() if "STATUS" in df_ps_escore.columns else []
+    return df_ps, all_status
+
+
+def filter_rows(df_ps_raw, master_appids):
+    """
+    Filter 1 + 2 sebagai posisi baris di df_ps_raw, tanpa frame perantara.
+    Return (jumlah lolos ESCORE, posisi lolos ESCORE + STATUS, all_status).
+    """
+    keep = df_ps_raw["APPID"].isin(master_appids).to_numpy()
+    n_escore = int(keep.sum())
+    all_status = []
+    if "STATUS" in df_ps_raw.columns:
+        status = df_ps_raw["STATUS"]
+        all_status = status[keep].dropna().unique().tolist()
+        keep &= status_ok(status).to_numpy()
+    return n_escore, np.flatnonzero(keep), all_status
+
+
+def join_slik(df_ps, df_slik, policy="all"):
+    """
+    LEFT JOIN ONE ME × SLIK sesuai `policy` (lihat JOIN_POLICIES).
+    Selain "all", join-nya lewat sort + key unik / as-of, jadi ukuran hasil
+    ≤ jumlah baris ONE ME (tidak meledak jadi perkalian baris per APPID).
+    """
+    # Rename kolom bentrok
+    df_slik_j = df_slik.rename(columns={"CABANG": "CABANG_SLIK", "Product": "Product_SLIK"})
+    if policy == "all":
+        # LEFT JOIN — TANPA dedup, semua baris ikut
+        return df_ps.merge(df_slik_j, on="APPID", how="left")
+    if policy not in JOIN_POLICIES:
+        raise ValueError(f"Policy join tidak dikenal: {policy!r}. Pilihan: {list(JOIN_POLICIES)}")
+
+    # Hit tanpa Timedone tidak pernah menghasilkan SLA
+    hits = df_slik_j[df_slik_j[TIMEDONE_COL].notna() & df_slik_j["APPID"].notna()]
+    hits = hits.sort_values(TIMEDONE_COL, kind="stable")
+
+    if policy == "latest":
+        last = hits.drop_duplicates("APPID", keep="last").set_index("APPID")
+        return df_ps.join(last, on="APPID")
+
+    if policy == "min_sla":
+        # min(Timedone − CREATED_AT) per APPID = min(Timedone) − max(CREATED_AT)
+        ps_last = (df_ps.sort_values("CREATED_AT", kind="stable", na_position="first")
+                   .drop_duplicates("APPID", keep="last"))
+        first = hits.drop_duplicates("APPID", keep="first").set_index("APPID")
+        return ps_last.join(first, on="APPID").sort_index()
+
+    # first_after: as-of join per APPID ke hit pertama dengan Timedone ≥ CREATED_AT
+    left  = df_ps.assign(_row=np.arange(len(df_ps)))
+    has_t = left["CREATED_AT"].notna()
+    right = hits.astype({"APPID": left["APPID"].dtype})
+    asof  = pd.merge_asof(
+        left[has_t].sort_values("CREATED_AT", kind="stable"), right,
+        left_on="CREATED_AT", right_on=TIMEDONE_COL, by="APPID", direction="forward",
+    )
+    out = pd.concat([asof, left[~has_t]], ignore_index=True).sort_values("_row", kind="stable")
+    out.index = df_ps.index[out.pop("_row").to_numpy()]
+    return out
+
+
+def compute_sla(df, mode="wall", calendar=None):
+    """
+    Kolom SLA_* dari CREATED_AT → Timedone. `mode` (lihat SLA_MODES): "wall" =
+    selisih jam kalender; "business" = jam kerja menurut `calendar`
+    (sla_calendar.make_calendar; default jam kantor 08–17, Senin–Jumat).
+    """
+    if mode not in SLA_MODES:
+        raise ValueError(f"Mode SLA tidak dikenal: {mode!r}. Pilihan: {list(SLA_MODES)}")
+    df = df.copy(deep=False)       # kolom baru tidak menyentuh frame input
+    df["_slik_found"] = df[TIMEDONE_COL].notna()
+    if mode == "business":
+        df["SLA_Hours"] = business_hours(df["CREATED_AT"], df[TIMEDONE_COL], calendar or make_calendar())
+    else:
+        df["SLA_Hours"] = (df[TIMEDONE_COL] - df["CREATED_AT"]).dt.total_seconds() / 3600
+    df["SLA_Minutes"] = df["SLA_Hours"] * 60
+    df["SLA_Hours"]   = df["SLA_Hours"].round(2)
+    df["SLA_Minutes"] = df["SLA_Minutes"].round(1)
+    df["SLA_Category"] = sla_category(df["SLA_Hours"])
+    df["SLA_Display"]  = fmt_sla_series(df["SLA_Hours"])
+    return df
+
+# ─────────────────────────────────────────────
+# OUTPUT
+# ─────────────────────────────────────────────
+def sla_per_appid(df_sla):
+    return df_sla[[c for c in SLA_COLUMNS if c in df_sla.columns]]
+
+
+def duplicate_rows(df_sla):
+    """Baris dengan APPID yang muncul lebih dari sekali, urut APPID."""
+    return df_sla[df_sla["APPID"].duplicated(keep=False)].sort_values("APPID", kind="stable")
+
+
+def dedup_min_sla(df_sla):
+    """Satu baris per APPID dengan SLA terkecil (groupby + idxmin, tanpa sort seluruh frame)."""
+    has  = df_sla[df_sla["SLA_Hours"].notna()]
+    best = has.loc[has.groupby("APPID", sort=False)["SLA_Hours"].idxmin()]
+    rest = df_sla[~df_sla["APPID"].isin(best["APPID"])].drop_duplicates("APPID")
+    return pd.concat([best, rest]) if len(rest) else best
+
+
+def branch_summary(df_sla):
+    """Ringkasan SLA per CABANG, urut Avg terbesar."""
+    return (
+        df_sla.groupby("CABANG", observed=True)["SLA_Hours"]
+        .agg(Total="count", Avg="mean", Median="median", Min="min", Max="max").round(2)
+        .reset_index().sort_values("Avg", ascending=False)
+    )
+
+
+def run_pipeline(escore_path, ps_path, slik_path,
+                 escore_sheet=SHEET_ESCORE, ps_sheet=SHEET_PS, slik_sheet=SHEET_SLIK,
+                 escore_col=ESCORE_COL, policy="all", sla_mode="wall", calendar=None,
+                 profile=None, trace_mem=False, load_workers=1):
+    """
+    Jalankan STEP 1–4 sekaligus (`policy` = kebijakan join SLIK, `sla_mode` &
+    `calendar` = cara hitung SLA, lihat compute_sla). Return dict:
+    df (hasil join + SLA), df_sla (yang match SLIK), all_status, counts (jumlah per step).
+    `profile` (list, opsional) diisi record sla_profile per step.
+    `load_workers` > 1 → workbook yang belum ter-cache di-parse paralel dulu (preload).
+    """
+    if load_workers > 1:
+        with step(profile, "preload paralel", trace_mem):
+            preload(escore_path, ps_path, slik_path, escore_sheet, ps_sheet, slik_sheet,
+                    escore_col, load_workers)
+    with step(profile, "read_excel ESCORE", trace_mem) as p:
+        master_appids   = load_master_appids(escore_path, escore_sheet, escore_col)
+        p["rows"] = len(master_appids)
+    with step(profile, "read_excel ONE ME", trace_mem) as p:
+        df_ps_raw       = load_ps(ps_path, ps_sheet, master_appids)
+        p["rows"] = len(df_ps_raw)
+    with step(profile, "filter ESCORE", trace_mem) as p:
+        df_ps_escore    = filter_escore(df_ps_raw, master_appids)
+        p["rows"] = len(df_ps_escore)
+    with step(profile, "filter STATUS", trace_mem) as p:
+        df_ps, all_status = filter_status(df_ps_escore)
+        p["rows"] = len(df_ps)
+    with step(profile, "read_excel SLIK", trace_mem) as p:
+        df_slik         = load_slik(slik_path, slik_sheet)
+        p["rows"] = len(df_slik)
+    with step(profile, "merge", trace_mem) as p:
+        df_join         = join_slik(df_ps, df_slik, policy)
+        p["rows"] = len(df_join)
+    with step(profile, "SLA", trace_mem) as p:
+        df              = compute_sla(df_join, sla_mode, calendar)
+        df_sla          = df[df["_slik_found"]]
+        p["rows"] = len(df_sla)
+    counts = {
+        "n_master":       len(master_appids),
+        "n_ps_raw_total": df_ps_raw.attrs["n_rows"],
+        "n_ps_escore":    len(df_ps_escore),
+        "n_ps_filtered":  len(df_ps),
+        "n_slik_raw":     len(df_slik),
+        "n_match":        int(df["_slik_found"].sum()),
+        "n_nomatch":      int((~df["_slik_found"]).sum()),
+    }
+    return {"df": df, "df_sla": df_sla, "all_status": all_status, "counts": counts}
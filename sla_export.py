@@ -0,0 +1,118 @@
+"""
+Paging, filter dan export untuk tabel Detail Data.
+
+Tabel tidak dikirim utuh ke browser: filter (APPID / CABANG) dan sort
+dikerjakan di server, yang dikirim cuma satu halaman. Export (CSV / Parquet /
+XLSX multi-sheet) baru dibuat saat diminta dan ditulis per chunk ke file
+sementara, bukan lewat satu string CSV/Excel besar; yang dikirim ke
+download_button cuma bytes hasil akhirnya.
+"""
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from sla_cache import arrow_safe
+
+PAGE_SIZE    = 100
+CHUNK_ROWS   = 50_000
+XLSX_MAX_ROWS = 1_048_575          # batas baris sheet Excel (minus header)
+SPOOL_BYTES  = 32 * 1024 * 1024    # di atas ini file export pindah dari RAM ke disk
+
+EXPORT_FORMATS = {
+    "CSV":     ("csv",     "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "XLSX":    ("xlsx",    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def sort_order(df, col, ascending=True):
+    """Urutan baris (posisi) berdasarkan `col`; NaN selalu di akhir."""
+    v = df[col].to_numpy(dtype=float)
+    key = v if ascending else -v
+    return np.argsort(np.where(np.isnan(key), np.inf, key), kind="stable")
+
+
+def search_mask(df, query, cols=("APPID", "CABANG")):
+    """Baris yang APPID-nya diawali `query` atau CABANG-nya mengandung `query` (case-insensitive)."""
+    query = (query or "").strip()
+    if not query:
+        return None
+    mask = np.zeros(len(df), dtype=bool)
+    if "APPID" in cols and "APPID" in df.columns and query.isdigit():
+        appid = df["APPID"].astype("Int64").astype(str)
+        mask |= appid.str.startswith(query).to_numpy(dtype=bool, na_value=False)
+    for c in cols:
+        if c == "APPID" or c not in df.columns:
+            continue
+        col = df[c]
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            # cocokkan sekali per kategori, lalu petakan balik lewat codes
+            hit = np.append(col.cat.categories.astype(str).str.contains(query, case=False, regex=False), False)
+            mask |= hit[col.cat.codes.to_numpy()]
+        else:
+            mask |= col.astype(str).str.contains(query, case=False, regex=False).to_numpy(dtype=bool)
+    return mask
+
+
+def page(df, page_no=1, page_size=PAGE_SIZE, order=None, mask=None):
+    """
+    Satu halaman `df` setelah filter `mask` dan urutan `order` (dari sort_order).
+    Return (df_halaman, jumlah_baris_setelah_filter, jumlah_halaman).
+    """
+    pos = np.arange(len(df)) if order is None else order
+    if mask is not None:
+        pos = pos[mask[pos]]
+    n = len(pos)
+    n_pages = max(1, -(-n // page_size))
+    page_no = min(max(1, page_no), n_pages)
+    sel = pos[(page_no - 1) * page_size: page_no * page_size]
+    return df.iloc[sel], n, n_pages
+
+
+def iter_csv(df, chunk_rows=CHUNK_ROWS):
+    """CSV per chunk (bytes); header hanya di chunk pertama."""
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=start == 0).encode()
+
+
+def _excel_safe(df):
+    # openpyxl tidak kenal Categorical → object (NaN tetap kosong, bukan teks "nan")
+    out = df.copy()
+    for c in out.columns:
+        if isinstance(out[c].dtype, pd.CategoricalDtype):
+            out[c] = out[c].astype(object).where(out[c].notna(), None)
+    return out
+
+
+def export_file(sheets, fmt):
+    """
+    Tulis `sheets` ({nama: df}) ke file sementara. CSV & Parquet cuma pakai
+    sheet pertama; XLSX menulis semua sheet (dipecah kalau > batas baris Excel).
+    Return bytes (tipe yang diterima st.download_button).
+    """
+    ext = EXPORT_FORMATS[fmt][0]
+    f = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    first = next(iter(sheets.values()))
+    if ext == "csv":
+        for chunk in iter_csv(first):
+            f.write(chunk)
+    elif ext == "parquet":
+        first  = arrow_safe(first.copy())
+        schema = pa.Schema.from_pandas(first, preserve_index=False)
+        with pq.ParquetWriter(f, schema) as writer:
+            for start in range(0, len(first), CHUNK_ROWS):
+                writer.write_table(pa.Table.from_pandas(first.iloc[start:start + CHUNK_ROWS],
+                                                        schema=schema, preserve_index=False))
+    else:
+        with pd.ExcelWriter(f, engine="openpyxl") as xw:
+            for name, df in sheets.items():
+                for i, start in enumerate(range(0, max(len(df), 1), XLSX_MAX_ROWS)):
+                    sheet = name if i == 0 else f"{name} ({i + 1})"
+                    _excel_safe(df.iloc[start:start + XLSX_MAX_ROWS]).to_excel(
+                        xw, sheet_name=sheet[:31], index=False)
+    f.seek(0)
+    with f:
+        return f.read()
@@ -0,0 +1,123 @@
+"""
+Dataset terindeks untuk filter dashboard (tanggal, CABANG, PRODUK, STATUS).
+
+Index tidak menyimpan salinan frame: cuma permutasi `order` yang mengurutkan
+hasil join (stabil) per CREATED_AT — None kalau frame sudah urut. Posisi di
+bawah ini semuanya posisi dalam urutan itu. Urutan itu dipartisi per hari:
+`bounds[i]` = posisi pertama hari `days[i]`, jadi rentang tanggal = rentang
+posisi kontigu yang dicari lewat binary search (np.searchsorted) di batas
+partisi — tanpa scan frame. Baris dengan CREATED_AT kosong ada di ekor dan
+cuma ikut kalau tanggal tidak difilter.
+
+Indeks sekunder per kolom = posting list: posisi baris (urut naik) per nilai,
+disimpan berdampingan dalam satu array + offset per nilai, plus kode nilai per
+baris. Filter → posting list dipotong ke rentang tanggal (binary search lagi);
+kolom yang paling selektif dipakai sebagai kandidat, kolom lain dicek lewat
+lookup kode di baris kandidat saja. Biaya select ikut jumlah baris kandidat,
+bukan ukuran dataset.
+"""
+import numpy as np
+import pandas as pd
+
+TIME_COLUMN   = "CREATED_AT"
+INDEX_COLUMNS = ("CABANG", "PRODUK", "STATUS")
+
+
+def _postings(s):
+    """Series → posting list: nilai, kode per baris, posisi baris per nilai (urut naik) + offset. NaN tidak diindeks."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        codes, values = s.cat.codes.to_numpy(), s.cat.categories
+    else:
+        codes, values = pd.factorize(s, sort=True)
+    order  = np.argsort(codes, kind="stable")          # stabil → posisi tetap urut naik per nilai
+    counts = np.bincount(codes[codes >= 0], minlength=len(values))
+    rows   = order[len(order) - counts.sum():]         # code -1 (NaN) ada di depan
+    keep   = counts > 0
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    itype  = np.int32 if len(s) < 2**31 else np.int64
+    return {
+        "values":  list(values[keep]),
+        "code":    {v: i for i, v in zip(np.flatnonzero(keep), values[keep])},
+        "codes":   codes.astype(itype),
+        "rows":    rows.astype(itype),
+        "offsets": offsets,
+    }
+
+
+def build(df, time_col=TIME_COLUMN, columns=INDEX_COLUMNS):
+    """df (hasil join + SLA) → index (dict): permutasi urut waktu, partisi harian, posting list per kolom."""
+    t     = df[time_col].to_numpy(dtype="datetime64[ns]")
+    order = np.argsort(t, kind="stable")                # NaT paling akhir
+    t     = t[order]
+    if np.array_equal(order, np.arange(len(order))):
+        order = None                                    # sudah urut → take() tanpa gather
+    else:
+        order = order.astype(np.int32 if len(order) < 2**31 else np.int64)
+    n_valid = int((~np.isnat(t)).sum())
+    days, starts = np.unique(t[:n_valid].astype("datetime64[D]"), return_index=True)
+    return {
+        "n":       len(df),
+        "order":   order,
+        "days":    days,
+        "bounds":  np.append(starts, n_valid),
+        "columns": {c: _postings(df[c] if order is None else df[c].take(order))
+                    for c in columns if c in df.columns},
+    }
+
+
+def date_bounds(index):
+    """(hari pertama, hari terakhir) sebagai datetime.date; (None, None) kalau tidak ada tanggal."""
+    days = index["days"]
+    if not len(days):
+        return None, None
+    return pd.Timestamp(days[0]).date(), pd.Timestamp(days[-1]).date()
+
+
+def values(index, col):
+    """Nilai yang ada di kolom terindeks `col` (untuk opsi filter)."""
+    ix = index["columns"].get(col)
+    return [] if ix is None else ix["values"]
+
+
+def select(index, start=None, end=None, filters=None):
+    """
+    Baris yang lolos filter. start/end (date, inklusif) → rentang partisi;
+    filters = {kolom: [nilai, ...]} (list kosong = tidak difilter).
+    Return slice (kalau cuma filter tanggal) atau array posisi urut naik —
+    posisi dalam urutan waktu index, dipetakan ke baris frame oleh take().
+    """
+    lo, hi = 0, index["n"]
+    if start is not None or end is not None:
+        days, bounds = index["days"], index["bounds"]
+        i  = 0 if start is None else np.searchsorted(days, np.datetime64(start, "D"), "left")
+        j  = len(days) if end is None else np.searchsorted(days, np.datetime64(end, "D"), "right")
+        lo, hi = int(bounds[i]), int(bounds[max(i, j)])
+    active = []                                  # (jumlah kandidat, kolom, kode, potongan posting list)
+    for col, vals in (filters or {}).items():
+        if not vals or col not in index["columns"]:
+            continue
+        ix    = index["columns"][col]
+        codes = [ix["code"][v] for v in vals if v in ix["code"]]
+        parts = []
+        for c in codes:
+            p    = ix["rows"][ix["offsets"][c]:ix["offsets"][c + 1]]
+            a, b = np.searchsorted(p, [lo, hi])
+            parts.append(p[a:b])
+        active.append((sum(len(p) for p in parts), col, codes, parts))
+    if not active:
+        return slice(lo, hi)
+    active.sort(key=lambda x: x[0])
+    _, _, _, parts = active[0]
+    rows = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+    for _, col, codes, _ in active[1:]:
+        ix   = index["columns"][col]
+        want = np.zeros(len(ix["offsets"]), dtype=bool)   # slot terakhir = NaN (kode -1)
+        want[codes] = True
+        rows = rows[want[ix["codes"][rows]]]
+    return rows
+
+
+def take(index, df, sel):
+    """Baris `df` (frame yang di-build) untuk hasil select(), urut waktu. Frame yang sudah urut + slice → tanpa gather."""
+    order = index["order"]
+    return df.iloc[sel] if order is None else df.iloc[order[sel]]
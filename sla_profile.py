@@ -0,0 +1,88 @@
+"""
+Instrumentasi per step pipeline SLA: wall time, CPU time, memori dan jumlah baris.
+
+Pemakaian:
+    prof = []
+    with step(prof, "read_excel ONE ME") as p:
+        df = load_ps(...)
+        p["rows"] = len(df)
+
+Tiap step di-append ke `prof` (list of dict) dan ditulis sebagai satu baris
+JSON ke logger "sla.profile", jadi step yang lambat di production kelihatan
+dari log tanpa perlu profiler. Memori selalu dicatat sebagai RSS proses
+(murah); peak alokasi Python/NumPy lewat tracemalloc hanya kalau
+`trace_mem=True` karena memperlambat parse openpyxl berkali-kali lipat.
+CPU time = process_time (seluruh proses, termasuk thread lain).
+"""
+import datetime
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:            # Windows
+    resource = None
+
+log = logging.getLogger("sla.profile")
+
+COLUMNS = ["step", "rows", "wall_s", "cpu_s", "rss_mb", "rss_delta_mb", "peak_mb"]
+
+
+def rss_mb():
+    """RSS proses saat ini (MB). Tanpa /proc → high-water mark getrusage; None kalau dua-duanya tidak ada."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+@contextmanager
+def step(records, name, trace_mem=False):
+    """
+    Ukur blok `with` sebagai satu step. Yield dict record — isi `rows` (atau
+    key lain) dari dalam blok. `records=None` → tidak disimpan, cuma di-log.
+    Jangan di-nest kalau trace_mem=True (peak tracemalloc di-reset per step).
+    """
+    rec = {"ts": datetime.datetime.now().isoformat(timespec="milliseconds"), "step": name, "rows": None}
+    started = trace_mem and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    elif trace_mem:
+        tracemalloc.reset_peak()
+    rss0 = rss_mb()
+    w0, c0 = time.perf_counter(), time.process_time()
+    try:
+        yield rec
+    finally:
+        rec["wall_s"] = round(time.perf_counter() - w0, 4)
+        rec["cpu_s"]  = round(time.process_time() - c0, 4)
+        rss1 = rss_mb()
+        rec["rss_mb"] = None if rss1 is None else round(rss1, 1)
+        rec["rss_delta_mb"] = None if rss1 is None or rss0 is None else round(rss1 - rss0, 1)
+        rec["peak_mb"] = None
+        if trace_mem:
+            rec["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+            if started:
+                tracemalloc.stop()
+        if records is not None:
+            records.append(rec)
+        log.info(json.dumps(rec, default=str))
+
+
+def to_json(records):
+    return json.dumps(records, indent=2, default=str)
+
+
+def log_lines(records):
+    """Satu baris JSON per step — format yang sama dengan yang dikirim ke logger."""
+    return "\n".join(json.dumps(r, default=str) for r in records) + ("\n" if records else "")
@@ -0,0 +1,130 @@
+"""
+Reader workbook streaming dengan proyeksi kolom.
+
+Pengganti `pd.read_excel` untuk file besar: baris dibaca pakai openpyxl
+`read_only` (tanpa materialisasi seluruh sheet), cuma kolom yang dipakai
+dashboard yang diambil, dan filter APPID bisa di-push ke scan supaya baris
+di luar master ESCORE tidak pernah disimpan. Tiap chunk langsung dikonversi
+ke array bertipe lewat `converters`.
+
+Daftar sheet dibaca langsung dari manifest di dalam zip xlsx (xl/workbook.xml)
+— tanpa openpyxl, jadi tidak ikut mem-parse sharedStrings/styles.
+"""
+import posixpath
+import xml.etree.ElementTree as ET
+import zipfile
+
+import openpyxl
+import pandas as pd
+
+HEADER_SCAN_ROWS = 50
+CHUNK_ROWS       = 50_000
+
+
+_OFFICE_DOCUMENT = "/officeDocument"
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def sheet_names(path):
+    """Nama sheet (urut seperti di Excel) dari manifest workbook di dalam zip xlsx/xlsm."""
+    with zipfile.ZipFile(path) as z:
+        part = "xl/workbook.xml"
+        # Lokasi workbook part resmi ada di _rels/.rels (relationship officeDocument)
+        if "_rels/.rels" in z.namelist():
+            for rel in ET.fromstring(z.read("_rels/.rels")):
+                if rel.get("Type", "").endswith(_OFFICE_DOCUMENT):
+                    part = posixpath.normpath(rel.get("Target", part).lstrip("/"))
+                    break
+        names = []
+        with z.open(part) as f:
+            for _, el in ET.iterparse(f):
+                if _local(el.tag) == "sheet":
+                    names.append(el.get("name"))
+                elif _local(el.tag) == "sheets":
+                    break
+        return names
+
+
+def _clean(v):
+    return str(v).strip() if v is not None else ""
+
+
+def find_header(ws, required, max_scan=HEADER_SCAN_ROWS):
+    """Cari baris header pertama yang memuat semua kolom `required`. Return (nomor_baris, nama_kolom)."""
+    seen = []
+    for i, row in enumerate(ws.iter_rows(max_row=max_scan, values_only=True), start=1):
+        names = [_clean(v) for v in row]
+        if all(c in names for c in required):
+            return i, names
+        if not seen and any(names):
+            seen = [n for n in names if n]
+    raise KeyError(f"Kolom {list(required)} tidak ada. Tersedia: {seen}")
+
+
+def _to_appid(v):
+    if v is None:
+        return None
+    if isinstance(v, (int, float)):
+        return int(v) if v == v else None
+    try:
+        return int(float(str(v).strip()))
+    except ValueError:
+        return None
+
+
+def read_columns(path, sheet, columns, required=None, key=None, keep=None,
+                 converters=None, chunk_rows=CHUNK_ROWS):
+    """
+    Baca subset `columns` dari `sheet`. Kolom yang tidak ada di file di-skip,
+    kecuali yang ada di `required` (default: semua `columns`) → KeyError.
+
+    key/keep   : kalau diisi, hanya baris dengan `key` (di-cast ke int) ∈ `keep` yang disimpan
+    converters : {kolom: fungsi(Series) → Series}, dijalankan per chunk
+
+    Return DataFrame; `df.attrs["n_rows"]` = jumlah baris data yang di-scan (sebelum filter).
+    """
+    required   = list(columns if required is None else required)
+    converters = converters or {}
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet]
+        hdr_row, names = find_header(ws, required)
+        cols = [c for c in columns if c in names]
+        pos  = [names.index(c) for c in cols]
+        lo, hi = min(pos), max(pos)
+        rel  = [p - lo for p in pos]
+        kpos = cols.index(key) if key is not None and keep is not None else None
+
+        chunks, buf, n_rows = [], [[] for _ in cols], 0
+
+        def flush():
+            chunk = pd.DataFrame({c: pd.Series(vals, dtype=object) for c, vals in zip(cols, buf)})
+            for c, fn in converters.items():
+                if c in chunk.columns:
+                    chunk[c] = fn(chunk[c])
+            chunks.append(chunk)
+            for vals in buf:
+                vals.clear()
+
+        for row in ws.iter_rows(min_row=hdr_row + 1, min_col=lo + 1, max_col=hi + 1, values_only=True):
+            if not any(v is not None for v in row):
+                continue
+            n_rows += 1
+            vals = [row[r] if r < len(row) else None for r in rel]
+            if kpos is not None and _to_appid(vals[kpos]) not in keep:
+                continue
+            for b, v in zip(buf, vals):
+                b.append(v)
+            if len(buf[0]) >= chunk_rows:
+                flush()
+        if buf[0] or not chunks:
+            flush()
+    finally:
+        wb.close()
+
+    df = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+    df.attrs["n_rows"] = n_rows
+    return df
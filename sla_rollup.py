@@ -0,0 +1,129 @@
+"""
+Rollup cube SLA: agregasi sekali per versi data, key = hari × CABANG × PRODUK
+× SLA_Category.
+
+Tiap sel menyimpan n (jumlah SLA_Hours non-null), n_rows, sum, min dan max,
+jadi KPI, pie kategori, bar per cabang, trend harian dan summary cabang cukup
+dihitung ulang dari cube — biayanya ikut jumlah cabang × hari, bukan jumlah
+aplikasi. Histogram punya rollup sendiri yang kecil (bin lebar tetap
+HIST_WIDTH jam → jumlah), supaya bin tidak ikut memecah sel cube.
+"""
+import numpy as np
+import pandas as pd
+
+from sla_engine import SLA_ORDER
+
+HIST_WIDTH = 0.5                  # jam per bin; kelipatan batas kategori (1, 3, 6, 24)
+DIMS       = ["Tanggal", "CABANG", "PRODUK", "SLA_Category"]
+
+
+def build_cube(df_sla):
+    """df_sla (baris yang match SLIK) → cube, satu baris per kombinasi DIMS."""
+    h = df_sla["SLA_Hours"]
+    keys = pd.DataFrame({
+        "Tanggal":      df_sla["CREATED_AT"].dt.normalize(),
+        "CABANG":       df_sla["CABANG"] if "CABANG" in df_sla.columns else "-",
+        "PRODUK":       df_sla["PRODUK"] if "PRODUK" in df_sla.columns else "-",
+        "SLA_Category": df_sla["SLA_Category"],
+        "h":            h,
+    })
+    return (
+        keys.groupby(DIMS, dropna=False, observed=True, sort=False)["h"]
+        .agg(n="count", n_rows="size", sum="sum", min="min", max="max")
+        .reset_index()
+    )
+
+
+def build_hist(df_sla):
+    """Rollup histogram: kolom bin, n — satu baris per bin HIST_WIDTH jam yang terisi."""
+    h = df_sla["SLA_Hours"].to_numpy(dtype=float)
+    h = h[~np.isnan(h)]
+    # bin b mencakup ((b-1)·w, b·w] — kanan inklusif seperti kategori SLA.
+    # Offset dari bin terkecil di data, tanpa clip: nilai ekstrem tetap di bin aslinya
+    b  = np.ceil(h / HIST_WIDTH).astype(np.int64)
+    lo = int(b.min()) if len(b) else 0
+    n  = np.bincount(b - lo)
+    idx = np.flatnonzero(n)
+    return pd.DataFrame({"bin": (idx + lo).astype(float), "n": n[idx]})
+
+
+def totals(cube):
+    """KPI keseluruhan: n, avg, min, max."""
+    n = int(cube["n"].sum())
+    return {
+        "n":   n,
+        "avg": cube["sum"].sum() / n if n else np.nan,
+        "min": cube["min"].min(),
+        "max": cube["max"].max(),
+    }
+
+
+def category_counts(cube):
+    """Jumlah baris per SLA_Category (urut SLA_ORDER, kategori kosong dibuang)."""
+    c = cube.groupby("SLA_Category", observed=True)["n_rows"].sum().reindex(SLA_ORDER)
+    return c[c > 0]
+
+
+def group_stats(cube, by):
+    """Avg/Count/Min/Max per dimensi `by` (mis. "CABANG" atau "Tanggal")."""
+    g = cube.groupby(by, observed=True, sort=True).agg(
+        Count=("n", "sum"), Sum=("sum", "sum"), Min=("min", "min"), Max=("max", "max"))
+    g.insert(1, "Avg", g.pop("Sum") / g["Count"].where(g["Count"] > 0))
+    return g.reset_index()
+
+
+def histogram(hist, max_hours=48, nbins=40):
+    """
+    Histogram SLA_Hours ≤ max_hours: kolom left, right, count. Bin dari
+    build_hist (lebar HIST_WIDTH) digabung per k bin berurutan supaya jumlah
+    bin ≤ nbins.
+    """
+    b = hist["bin"].to_numpy(dtype=float)
+    n = hist["n"].to_numpy(dtype=float)
+    keep = (b * HIST_WIDTH <= max_hours) & (n > 0)
+    b, n = b[keep].astype(np.int64), n[keep]
+    if not len(b):
+        return pd.DataFrame({"left": [], "right": [], "count": []})
+    lo = b.min()
+    k  = max(1, int(np.ceil((b.max() - lo + 1) / nbins)))
+    count = np.bincount((b - lo) // k, n)
+    idx   = np.flatnonzero(count)
+    left  = (lo - 1 + idx * k) * HIST_WIDTH
+    return pd.DataFrame({"left": left, "right": left + k * HIST_WIDTH, "count": count[idx].astype(np.int64)})
+
+
+def trend(cube, max_points=120):
+    """
+    Avg SLA & jumlah per periode (kolom Tanggal, Avg, Count) + panjang periode
+    dalam hari. Rentang > max_points hari digabung per k hari (k = ceil(hari /
+    max_points)), jadi jumlah titik chart tidak ikut panjang data.
+    """
+    c = cube[cube["Tanggal"].notna()]
+    if c.empty:
+        return pd.DataFrame({"Tanggal": [], "Avg": [], "Count": []}), 1
+    day = c["Tanggal"].to_numpy().astype("datetime64[D]").astype(np.int64)
+    d0  = day.min()
+    k   = max(1, int(np.ceil((day.max() - d0 + 1) / max_points)))
+    idx = (day - d0) // k
+    cnt = np.bincount(idx, c["n"].to_numpy(dtype=float))
+    tot = np.bincount(idx, c["sum"].to_numpy(dtype=float))
+    has = np.flatnonzero(np.bincount(idx))                     # periode yang punya baris
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg = np.where(cnt[has] > 0, tot[has] / cnt[has], np.nan)
+    start = (d0 + has * k).astype("datetime64[D]").astype("datetime64[ns]")
+    return pd.DataFrame({"Tanggal": start, "Avg": avg, "Count": cnt[has].astype(np.int64)}), k
+
+
+def summary(cube, by="CABANG", quantiles=None):
+    """
+    Summary per `by` (CABANG / PRODUK / Tanggal) dari cube: Total, Avg, Min, Max.
+    `quantiles` = output sla_sketch.quantiles(…, [by]) → kolom Median (p50), P90, P95, P99.
+    """
+    g = group_stats(cube, by).rename(columns={"Count": "Total"})
+    cols = [by, "Total", "Avg"]
+    if quantiles is not None:
+        q = quantiles.rename(columns={"p50": "Median", "p90": "P90", "p95": "P95", "p99": "P99"})
+        g = g.merge(q, on=by, how="left")
+        cols += [c for c in ("Median", "P90", "P95", "P99") if c in g.columns]
+    g = g[cols + ["Min", "Max"]]
+    return g.round({c: 2 for c in cols[1:] + ["Min", "Max"] if c != "Total"}).sort_values("Avg", ascending=False)
@@ -0,0 +1,153 @@
+"""
+Cache dataset bersama satu proses (dipakai semua sesi Streamlit).
+
+Beda dengan st.cache_data, nilai tidak di-pickle/copy per sesi: semua sesi
+menerima objek yang SAMA, jadi frame hasil load & join cuma ada satu salinan
+per versi data. Konsekuensinya hasil stage wajib diperlakukan read-only.
+
+- Key = nama fungsi + argumen (argumen berawalan `_` tidak ikut, seperti
+  konvensi st.cache_data).
+- Budget memori (MB) dari env SLA_SHARED_CACHE_MB; lewat budget → entry yang
+  paling lama tidak dipakai (LRU) dibuang. Entry yang sendirian sudah lebih
+  besar dari budget dikembalikan tanpa disimpan.
+- `Source` (path, sheet, fingerprint) di dalam key = dependensi file. Tiap
+  akses, file dependensi di-stat; kalau size/mtime sudah beda, semua entry
+  yang bergantung padanya langsung dibuang.
+- Dua sesi yang minta key yang sama bersamaan → build sekali, yang lain menunggu.
+"""
+import collections
+import functools
+import inspect
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+BUDGET_MB = float(os.environ.get("SLA_SHARED_CACHE_MB", 2048))
+
+# Sumber data: path absolut, sheet, fingerprint (size, mtime_ns, sha256)
+Source = collections.namedtuple("Source", ["path", "sheet", "fp"])
+
+_lock     = threading.Lock()
+_entries  = collections.OrderedDict()    # key → (value, nbytes, sources); urutan = LRU → MRU
+_building = {}                           # key → threading.Event selama build berjalan
+_stats    = {"hits": 0, "misses": 0, "evicted": 0, "invalidated": 0, "bytes": 0}
+_budget   = [int(BUDGET_MB * 2**20)]
+
+
+def nbytes(obj):
+    """Perkiraan memori objek hasil stage (DataFrame deep, ndarray, container)."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(nbytes(v) for v in obj.values())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(nbytes(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+def _sources(key):
+    """Semua Source di dalam key (rekursif lewat tuple/list)."""
+    if isinstance(key, Source):
+        return {key}
+    if isinstance(key, (tuple, list)):
+        return set().union(*(_sources(k) for k in key)) if key else set()
+    return set()
+
+
+def _drop(key, counter):
+    _, size, _ = _entries.pop(key)
+    _stats["bytes"] -= size
+    _stats[counter] += 1
+
+
+def _sweep():
+    """Buang entry yang file sumbernya sudah berubah di disk (size / mtime beda)."""
+    stat = {}
+    for key, (_, _, srcs) in list(_entries.items()):
+        for s in srcs:
+            if s.path not in stat:
+                try:
+                    st = os.stat(s.path)
+                    stat[s.path] = (st.st_size, st.st_mtime_ns)
+                except OSError:
+                    stat[s.path] = None
+            # fp None = file memang tidak ada waktu key dibuat (mis. file libur opsional)
+            if stat[s.path] != (None if s.fp is None else tuple(s.fp[:2])):
+                _drop(key, "invalidated")
+                break
+
+
+def _put(key, value):
+    size = nbytes(value)
+    if size > _budget[0]:
+        return
+    _entries[key] = (value, size, _sources(key))
+    _stats["bytes"] += size
+    while _stats["bytes"] > _budget[0] and len(_entries) > 1:
+        _drop(next(iter(_entries)), "evicted")
+
+
+def get_or_build(key, build):
+    """Nilai untuk `key` dari cache, atau build() sekali lalu simpan."""
+    while True:
+        with _lock:
+            _sweep()
+            if key in _entries:
+                _entries.move_to_end(key)
+                _stats["hits"] += 1
+                return _entries[key][0]
+            pending = _building.get(key)
+            if pending is None:
+                pending = _building[key] = threading.Event()
+                _stats["misses"] += 1
+                break
+        # Sesi lain sedang build key yang sama → tunggu, lalu cek ulang
+        pending.wait()
+    try:
+        value = build()
+        with _lock:
+            _put(key, value)
+        return value
+    finally:
+        with _lock:
+            _building.pop(key, None)
+        pending.set()
+
+
+def cached(fn):
+    """Decorator: hasil `fn` disimpan di cache bersama (lihat docstring modul)."""
+    sig  = inspect.signature(fn)
+    name = f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        bound = sig.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = (name,) + tuple((k, v) for k, v in bound.arguments.items() if not k.startswith("_"))
+        return get_or_build(key, lambda: fn(*args, **kwargs))
+    return wrapper
+
+
+def set_budget(mb):
+    with _lock:
+        _budget[0] = int(mb * 2**20)
+        while _stats["bytes"] > _budget[0] and _entries:
+            _drop(next(iter(_entries)), "evicted")
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+        _stats["bytes"] = 0
+
+
+def stats():
+    with _lock:
+        return {**_stats, "entries": len(_entries), "budget": _budget[0]}
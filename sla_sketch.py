@@ -0,0 +1,135 @@
+"""
+Sketch kuantil SLA (gaya t-digest) yang bisa di-merge.
+
+Sketch = kumpulan centroid (mean, weight) per grup, disimpan sebagai satu
+DataFrame panjang. Ukuran centroid dibatasi fungsi skala k1 t-digest
+(`DELTA` = kompresi): centroid kecil di ekor, besar di tengah, jadi
+p90/p95/p99 tetap akurat. Build, merge dan query kuantil semuanya vectorized —
+tidak ada loop Python per grup.
+
+Per kombinasi hari × CABANG × PRODUK isinya hampir satu baris per grup, jadi
+sketch di level itu tidak mengecil. Karena itu build() langsung menyimpan
+sketch yang sudah ter-kompres per level yang di-query dashboard (`LEVELS`:
+total, CABANG, PRODUK, hari). Query cuma membaca level itu (ratusan centroid
+per grup), tidak pernah kembali ke data per baris.
+"""
+import numpy as np
+import pandas as pd
+
+DELTA     = 200
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+LEVELS    = [(), ("CABANG",), ("PRODUK",), ("Tanggal",)]
+
+
+def _k(q, delta):
+    return delta / (2 * np.pi) * np.arcsin(2 * np.clip(q, 0, 1) - 1)
+
+
+def _group_codes(df, by):
+    if not by:
+        return np.zeros(len(df), dtype=np.int64)
+    return df.groupby(by, sort=True, observed=True, dropna=False).ngroup().to_numpy()
+
+
+def _group_stats(g, weights):
+    """g sudah urut → (total weight grup, cumsum weight dalam grup) per elemen."""
+    start = np.r_[True, g[1:] != g[:-1]] if len(g) else np.zeros(0, dtype=bool)
+    gid   = np.cumsum(start) - 1
+    cs    = np.cumsum(weights)
+    base  = (cs - weights)[start][gid]
+    return np.bincount(gid, weights)[gid], cs - base
+
+
+def _compress(keys, g, means, weights, delta):
+    """Gabung centroid per grup `g`: bucket = floor(k(q_tengah)) di tiap grup."""
+    order   = np.lexsort((means, g))
+    g, means, weights = g[order], means[order], weights[order]
+    total, cum = _group_stats(g, weights)
+    q_mid   = (cum - weights / 2) / total
+    bucket  = np.floor(_k(q_mid, delta) - _k(0, delta)).astype(np.int64)
+
+    new  = np.r_[True, (g[1:] != g[:-1]) | (bucket[1:] != bucket[:-1])] if len(g) else np.zeros(0, dtype=bool)
+    cid  = np.cumsum(new) - 1
+    wsum = np.bincount(cid, weights)
+    out  = keys.iloc[order[new]].reset_index(drop=True)
+    out["mean"]   = np.bincount(cid, means * weights) / wsum if len(g) else []
+    out["weight"] = wsum
+    return out
+
+
+def build(df_sla, levels=LEVELS, delta=DELTA):
+    """
+    df_sla → sketch: dict {level (tuple kolom): DataFrame centroid}, satu per
+    level yang kolomnya ada. Baris dengan SLA_Hours NaN diabaikan.
+    """
+    d = df_sla[df_sla["SLA_Hours"].notna()]
+    h = d["SLA_Hours"].to_numpy(dtype=float)
+    out = {}
+    for by in levels:
+        if not all(c in d.columns or c == "Tanggal" for c in by):
+            continue
+        keys = pd.DataFrame({
+            c: (d["CREATED_AT"].dt.normalize() if c == "Tanggal" else d[c]) for c in by
+        }).reset_index(drop=True) if by else pd.DataFrame(index=pd.RangeIndex(len(d)))
+        out[tuple(by)] = _compress(keys, _group_codes(keys, list(by)), h, np.ones_like(h), delta)
+    return out
+
+
+def merge(level, by, delta=DELTA):
+    """Merge sketch satu level ke dimensi `by` (subset kolom level itu; [] = total keseluruhan)."""
+    keys = level[list(by)].reset_index(drop=True)
+    return _compress(keys, _group_codes(keys, list(by)),
+                     level["mean"].to_numpy(float), level["weight"].to_numpy(float), delta)
+
+
+def _level(sketch, by, delta):
+    """Sketch level `by`: langsung kalau tersimpan, kalau tidak di-merge dari level tersimpan yang mencakupnya."""
+    if tuple(by) in sketch:
+        return sketch[tuple(by)]
+    src = [lv for lv in sketch if set(by) <= set(lv)]
+    if not src:
+        raise KeyError(f"Level {list(by)} tidak ada di sketch. Tersedia: {[list(lv) for lv in sketch]}")
+    return merge(sketch[min(src, key=lambda lv: len(sketch[lv]))], by, delta)
+
+
+def quantiles(sketch, by=(), qs=QUANTILES, delta=DELTA):
+    """
+    Kuantil per grup `by`. Return DataFrame kolom `by` + p50/p90/... (dalam jam).
+    Interpolasi linear antar pusat centroid; di luar itu di-clamp ke centroid ujung.
+    Grup yang semua centroid-nya singleton dihitung exact (= groupby().quantile()).
+    Sketch kosong (tidak ada SLA_Hours) → by=[]: satu baris NaN; selain itu frame kosong.
+    """
+    by = list(by)
+    m  = _level(sketch, by, delta)
+    cols = [f"p{round(q * 100):g}" for q in qs]
+    if not len(m):
+        out = m[by].reset_index(drop=True) if by else pd.DataFrame(index=[0])
+        for c in cols:
+            out[c] = np.nan
+        return out
+    g  = _group_codes(m, by)
+    order = np.lexsort((m["mean"].to_numpy(), g))
+    m, g  = m.iloc[order].reset_index(drop=True), g[order]
+    w     = m["weight"].to_numpy(float)
+    total, cum = _group_stats(g, w)
+    first = np.r_[0, np.flatnonzero(np.diff(g)) + 1]              # index centroid pertama tiap grup
+    last  = np.r_[first[1:], len(g)] - 1
+    pos   = (cum - w / 2) / total                                 # posisi pusat centroid ∈ (0, 1)
+    # Grup yang centroid-nya singleton semua (grup kecil) = nilai exact → posisi
+    # i/(n-1), sama dengan kuantil linear pandas/numpy (tidak di-clamp ke ujung)
+    gi    = np.repeat(np.arange(len(first)), last - first + 1)
+    n_c   = (last - first + 1)[gi]
+    pos   = np.where(total == n_c, (np.arange(len(g)) - first[gi]) / np.maximum(n_c - 1, 1), pos)
+    key   = g + pos                                               # naik monoton lintas grup
+    mean  = m["mean"].to_numpy(float)
+
+    out   = m.iloc[first][by].reset_index(drop=True) if by else pd.DataFrame(index=[0])
+    gid   = g[first]
+    for q, col in zip(qs, cols):
+        j  = np.searchsorted(key, gid + q)                        # centroid pertama dengan posisi ≥ q
+        hi = np.minimum(j, last)
+        lo = np.maximum(j - 1, first)
+        span = key[hi] - key[lo]
+        t  = np.where(span > 0, (gid + q - key[lo]) / np.where(span > 0, span, 1), 0.0)
+        out[col] = mean[lo] + np.clip(t, 0, 1) * (mean[hi] - mean[lo])
+    return out
@@ -3,8 +3,24 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import datetime
 import os
 
+import sla_calendar
+from sla_cache import file_fingerprint
+from sla_engine import (
+    FILE_ESCORE, FILE_PS, FILE_SLIK, SHEET_ESCORE, SHEET_PS, SHEET_SLIK, ESCORE_COL, TIMEDONE_COL,
+    JOIN_POLICIES, SLA_MODES, compute_sla, dedup_min_sla, duplicate_rows, filter_rows, fmt_sla,
+    get_sheets, join_slik, load_master_appids, load_ps, load_slik, preload, sla_per_appid,
+)
+import sla_export
+import sla_index
+import sla_profile
+import sla_rollup
+import sla_shared
+import sla_sketch
+from sla_store import DEFAULT_STORE, load_result, open_store, store_version, sync
+
 # ─────────────────────────────────────────────
 # PAGE CONFIG
 # ─────────────────────────────────────────────
@@ -89,44 +105,140 @@ PL = dict(
 )
 
 SLA_COLORS = {"≤ 1 Jam":"#34d399","1–3 Jam":"#60a5fa","3–6 Jam":"#fbbf24","6–24 Jam":"#fb923c","> 24 Jam":"#f87171","No Data":"#6b7280"}
-SLA_ORDER  = ["≤ 1 Jam","1–3 Jam","3–6 Jam","6–24 Jam","> 24 Jam","No Data"]
-
-def sla_category(h):
-    if pd.isna(h):   return "No Data"
-    elif h <= 1:     return "≤ 1 Jam"
-    elif h <= 3:     return "1–3 Jam"
-    elif h <= 6:     return "3–6 Jam"
-    elif h <= 24:    return "6–24 Jam"
-    else:            return "> 24 Jam"
-
-def parse_dt(s):
-    return pd.to_datetime(s, infer_datetime_format=True, errors="coerce")
-
-def fmt_sla(hours):
-    """Format jam desimal → '5 jam 32 menit'"""
-    if pd.isna(hours) or hours < 0:
-        return "-"
-    total_min = int(round(hours * 60))
-    h = total_min // 60
-    m = total_min % 60
-    if h == 0:
-        return f"{m} menit"
-    elif m == 0:
-        return f"{h} jam"
-    else:
-        return f"{h} jam {m} menit"
 
 # ─────────────────────────────────────────────
-# CONFIG
+# PIPELINE STAGES
 # ─────────────────────────────────────────────
-FILE_ESCORE = "APPID ONE ME PRESCREEN ESCORE.xlsx"
-FILE_PS     = "ONE ME PRE SCREENING.xlsx"
-FILE_SLIK   = "SLIK.xlsx"
-SHEET_ESCORE    = "Sheet1"
-SHEET_PS        = "all raw"
-SHEET_SLIK      = "Sheet1"
-ESCORE_COL      = "APPID_ONEME_PRESCREEN"
-TIMEDONE_COL    = "Timedone Hit SLIK"
+# Semua logika ada di sla_engine (tanpa Streamlit). Di sini cuma wrapper
+# cache per stage — key-nya input stage itu sendiri.
+# `src` = sla_shared.Source(path, sheet, fingerprint); fingerprint ikut key
+# supaya file yang berubah di disk otomatis invalidasi stage-stage turunannya.
+# Stage yang hasilnya besar (frame load/join/SLA, cube, sketch, urutan tabel)
+# pakai sla_shared.cached: satu salinan untuk semua sesi, budget memori + LRU,
+# dan entry langsung dibuang begitu file sumbernya berubah. Hasilnya dipakai
+# bersama antar sesi → jangan dimodifikasi in-place. Stage kecil tetap
+# st.cache_data.
+def source_key(path, sheet):
+    fp = file_fingerprint(path)
+    # path absolut → "SLIK.xlsx" dan "./SLIK.xlsx" satu entry, dan _sweep tidak bergantung CWD
+    return sla_shared.Source(fp["path"], sheet, (fp["size"], fp["mtime_ns"], fp["sha256"]))
+
+@st.cache_data(show_spinner=False)
+def stage_sheets(path, fp):
+    return get_sheets(path)
+
+# Cold start: ketiga workbook di-parse paralel (process pool) ke cache Arrow,
+# stage di bawah tinggal baca cache-nya. Sekali per versi file.
+@st.cache_data(show_spinner=False)
+def stage_preload(escore_src, escore_col, ps_src, slik_src):
+    preload(escore_src.path, ps_src.path, slik_src.path, escore_src.sheet, ps_src.sheet, slik_src.sheet, escore_col)
+
+@sla_shared.cached
+def stage_escore(escore_src, escore_col):
+    path, sheet, _ = escore_src
+    return load_master_appids(path, sheet, escore_col)
+
+@sla_shared.cached
+def stage_ps(ps_src, escore_src, escore_col):
+    path, sheet, _ = ps_src
+    return load_ps(path, sheet, stage_escore(escore_src, escore_col))
+
+@sla_shared.cached
+def stage_slik(slik_src):
+    path, sheet, _ = slik_src
+    return load_slik(path, sheet)
+
+# Filter ESCORE + STATUS disimpan sebagai posisi baris di stage_ps, bukan frame baru
+@sla_shared.cached
+def stage_ps_rows(ps_src, escore_src, escore_col):
+    return filter_rows(stage_ps(ps_src, escore_src, escore_col), stage_escore(escore_src, escore_col))
+
+def ps_filtered(ps_src, escore_src, escore_col):
+    df_ps = stage_ps(ps_src, escore_src, escore_col)
+    _, rows, _ = stage_ps_rows(ps_src, escore_src, escore_col)
+    return df_ps if len(rows) == len(df_ps) else df_ps.take(rows)
+
+# `cal_key` = (jam buka, jam tutup, weekmask, Source file libur) — None untuk jam kalender
+@st.cache_data(show_spinner=False)
+def stage_calendar(cal_key):
+    open_time, close_time, weekmask, holidays = cal_key
+    return sla_calendar.make_calendar(open_time, close_time, weekmask, sla_calendar.load_holidays(holidays.path))
+
+# Hasil join tidak di-cache terpisah — cuma perantara; yang disimpan frame akhir + SLA
+@sla_shared.cached
+def stage_sla(ps_src, escore_src, escore_col, slik_src, policy, sla_mode="wall", cal_key=None):
+    df_join = join_slik(ps_filtered(ps_src, escore_src, escore_col), stage_slik(slik_src), policy)
+    return compute_sla(df_join, sla_mode, stage_calendar(cal_key) if cal_key else None)
+
+@sla_shared.cached
+def stage_matched(data_key, _df):
+    return _df[_df["_slik_found"]]
+
+# ── Filter sidebar: index (urut + partisi per hari, posting list) sekali per versi data ──
+@sla_shared.cached
+def stage_index(data_key, _df):
+    return sla_index.build(_df)
+
+@sla_shared.cached
+def stage_view(data_key, start, end, filters, _idx, _df):
+    view = sla_index.take(_idx, _df, sla_index.select(_idx, start, end, dict(filters)))
+    return view, view[view["_slik_found"]]
+
+# ── Mode incremental: file di sidebar = delta yang di-ingest ke SQLite store ──
+@st.cache_data(show_spinner=False)
+def stage_store_sync(store_path, escore_src, escore_col, ps_src, slik_src):
+    con = open_store(store_path)
+    try:
+        return sync(con, escore=(escore_src[0], escore_src[1], escore_col), ps=ps_src[:2], slik=slik_src[:2])
+    finally:
+        con.close()
+
+@sla_shared.cached
+def stage_store_load(store_path, version, sla_mode="wall", cal_key=None):
+    con = open_store(store_path)
+    try:
+        res = load_result(con)
+    finally:
+        con.close()
+    if sla_mode != "wall":
+        # Store menyimpan SLA jam kalender; mode lain dihitung ulang dari timestamp
+        res["df"]     = compute_sla(res["df"], sla_mode, stage_calendar(cal_key) if cal_key else None)
+        res["df_sla"] = res["df"][res["df"]["_slik_found"]]
+    return res
+
+# ── Rollup cube: sekali per versi data / slice filter (`view_key`); df_sla tidak ikut di-hash ──
+@sla_shared.cached
+def stage_cube(data_key, _df_sla):
+    return sla_rollup.build_cube(_df_sla)
+
+@sla_shared.cached
+def stage_hist(data_key, _df_sla):
+    return sla_rollup.build_hist(_df_sla)
+
+# ── Sketch kuantil: dibangun sekali per versi data, di-merge per level on demand ──
+@sla_shared.cached
+def stage_sketch(data_key, _df_sla):
+    return sla_sketch.build(_df_sla)
+
+@st.cache_data(show_spinner=False)
+def stage_quantiles(data_key, by, _sketch):
+    return sla_sketch.quantiles(_sketch, list(by))
+
+# ── Detail Data: urutan & hasil pencarian di-cache per versi data, bukan per halaman ──
+@sla_shared.cached
+def stage_order(data_key, table, col, ascending, _df):
+    return sla_export.sort_order(_df, col, ascending)
+
+@sla_shared.cached
+def stage_search(data_key, table, query, _df):
+    return sla_export.search_mask(_df, query)
+
+def current_store_version(store_path):
+    con = open_store(store_path)
+    try:
+        return store_version(con)
+    finally:
+        con.close()
 
 # ─────────────────────────────────────────────
 # SIDEBAR
@@ -151,6 +263,38 @@ with st.sidebar:
     slik_sheet   = st.text_input("Sheet SLIK",     value=SHEET_SLIK)
     escore_col   = st.text_input("Kolom APPID ESCORE", value=ESCORE_COL)
 
+    st.markdown("<hr style='border-color:rgba(255,255,255,0.07);margin:14px 0;'>", unsafe_allow_html=True)
+    use_store    = st.checkbox("Mode incremental (SQLite store)", value=False,
+                               help="File di atas diperlakukan sebagai delta dan di-upsert ke store; dashboard baca dari store.")
+    store_path   = st.text_input("File store", value=DEFAULT_STORE, disabled=not use_store)
+    policy       = st.selectbox("Kebijakan match SLIK", list(JOIN_POLICIES), format_func=JOIN_POLICIES.get,
+                                disabled=use_store, help="Mode incremental selalu pakai semua pasangan.")
+    if use_store:
+        policy = "all"
+    st.markdown("<hr style='border-color:rgba(255,255,255,0.07);margin:14px 0;'>", unsafe_allow_html=True)
+    sla_mode     = st.selectbox("Mode SLA", list(SLA_MODES), format_func=SLA_MODES.get)
+    cal_key      = None
+    if sla_mode == "business":
+        o1, o2 = st.columns(2)
+        open_time  = o1.time_input("Jam buka",  datetime.time(*map(int, sla_calendar.OFFICE_OPEN.split(":"))))
+        close_time = o2.time_input("Jam tutup", datetime.time(*map(int, sla_calendar.OFFICE_CLOSE.split(":"))))
+        work_days  = st.multiselect("Hari kerja", sla_calendar.DAY_NAMES,
+                                    default=[d for d, w in zip(sla_calendar.DAY_NAMES, sla_calendar.WEEKMASK) if w == "1"])
+        holidays_path = st.text_input("File libur nasional (CSV)", value=sla_calendar.HOLIDAYS_FILE)
+        if not os.path.exists(holidays_path):
+            st.caption("File libur tidak ada — hanya akhir pekan yang dilewati.")
+        cal_key = (open_time.strftime("%H:%M"), close_time.strftime("%H:%M"),
+                   "".join("1" if d in work_days else "0" for d in sla_calendar.DAY_NAMES),
+                   source_key(holidays_path, "") if os.path.exists(holidays_path)
+                   else sla_shared.Source(os.path.abspath(holidays_path), "", None))
+        try:
+            stage_calendar(cal_key)
+        except ValueError as e:
+            st.error(e.args[0]); st.stop()
+
+    trace_mem    = st.checkbox("Profil memori (tracemalloc)", value=False,
+                               help="Catat peak alokasi per step di panel profiling. Parse Excel jadi jauh lebih lambat.")
+
     st.markdown("""
     <hr style='border-color:rgba(255,255,255,0.07);margin:14px 0;'>
     <p style='font-size:10px;color:rgba(255,255,255,0.2);line-height:1.8;'>
@@ -186,86 +330,82 @@ if missing:
 # ─────────────────────────────────────────────
 # LOAD & JOIN
 # ─────────────────────────────────────────────
+prof = []   # record sla_profile per step → panel "Profiling tiap step" di bawah
+
+def profiled(name):
+    return sla_profile.step(prof, name, trace_mem)
+
 with st.spinner("Memuat data..."):
 
+    escore_src = source_key(escore_path, escore_sheet)
+    ps_src     = source_key(ps_path, ps_sheet)
+    slik_src   = source_key(slik_path, slik_sheet)
+
     # ── STEP 1: Master APPID dari ESCORE ──
     # Cek semua sheet yang tersedia
-    import openpyxl
-    def get_sheets(path):
-        try:
-            wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
-            sheets = wb.sheetnames; wb.close(); return sheets
-        except: return []
-
-    escore_sheets = get_sheets(escore_path)
-    ps_sheets     = get_sheets(ps_path)
-    slik_sheets   = get_sheets(slik_path)
+    with profiled("get_sheets ESCORE"):
+        escore_sheets = stage_sheets(escore_src.path, escore_src.fp)
+    with profiled("get_sheets ONE ME"):
+        ps_sheets     = stage_sheets(ps_src.path, ps_src.fp)
+    with profiled("get_sheets SLIK"):
+        slik_sheets   = stage_sheets(slik_src.path, slik_src.fp)
 
     with st.expander("🔍 Debug Info — klik untuk lihat sheets tersedia", expanded=False):
         st.write(f"**ESCORE sheets:** {escore_sheets}")
         st.write(f"**ONE ME sheets:** {ps_sheets}")
         st.write(f"**SLIK sheets:** {slik_sheets}")
 
-    df_escore = pd.read_excel(escore_path, sheet_name=escore_sheet)
-    df_escore.columns = df_escore.columns.str.strip()
-    if escore_col not in df_escore.columns:
-        st.error(f"Kolom '{escore_col}' tidak ada. Tersedia: {list(df_escore.columns)}"); st.stop()
-    master_appids = set(pd.to_numeric(df_escore[escore_col], errors="coerce").dropna().astype(int))
-    n_master = len(master_appids)
-
-    # ── STEP 2: ONE ME → filter pakai master APPID, ambil CREATED_AT ──
-    df_ps_raw = pd.read_excel(ps_path, sheet_name=ps_sheet)
-    df_ps_raw.columns = df_ps_raw.columns.str.strip()
-    df_ps_raw["APPID"] = pd.to_numeric(df_ps_raw["APPID"], errors="coerce")
-    df_ps_raw["CREATED_AT"] = parse_dt(df_ps_raw["CREATED_AT"])
-    n_ps_raw = len(df_ps_raw)
-
-    # Step count detail
-    n_ps_raw_total  = len(df_ps_raw)                                          # total baris ONE ME
-
-    # Filter 1: hanya APPID yang ada di master ESCORE
-    df_ps_escore    = df_ps_raw[df_ps_raw["APPID"].isin(master_appids)].copy()
-    n_ps_escore     = len(df_ps_escore)                                       # ketemu di ONE ME
-
-    # Filter 2: status APPROVED atau DENIED
-    if "STATUS" in df_ps_escore.columns:
-        status_clean = df_ps_escore["STATUS"].astype(str).str.strip().str.upper()
-        mask_status  = status_clean.str.contains("APPROVED|DENIED", na=False)
-        df_ps        = df_ps_escore[mask_status].copy()
+    if use_store:
+        # ── STEP 1–4 dari store incremental ──
+        try:
+            with profiled("store sync"):
+                stage_store_sync(store_path, escore_src, escore_col, ps_src, slik_src)
+        except KeyError as e:
+            st.error(e.args[0]); st.stop()
+        data_key = ("store", store_path, current_store_version(store_path), sla_mode, cal_key)
+        with profiled("store load") as p:
+            res = stage_store_load(*data_key[1:])
+            p["rows"] = len(res["df"])
+        df, _all_status = res["df"], res["all_status"]
+        n_master, n_ps_raw_total, n_ps_escore, n_ps_filtered, n_slik_raw, n_match, n_nomatch = (
+            res["counts"][k] for k in ("n_master", "n_ps_raw_total", "n_ps_escore", "n_ps_filtered",
+                                       "n_slik_raw", "n_match", "n_nomatch"))
+        df_sla = res["df_sla"]
     else:
-        df_ps = df_ps_escore.copy()
-
-    n_ps_filtered   = len(df_ps)                                              # setelah filter status
-    _all_status     = df_ps_escore["STATUS"].dropna().unique().tolist() if "STATUS" in df_ps_escore.columns else []
-
-    # ── STEP 3: SLIK ──
-    df_slik = pd.read_excel(slik_path, sheet_name=slik_sheet)
-    df_slik.columns = df_slik.columns.str.strip()
-    df_slik["APPID"] = pd.to_numeric(df_slik["APPID"], errors="coerce")
-    df_slik[TIMEDONE_COL] = parse_dt(df_slik[TIMEDONE_COL])
-    if "Tanggal Hit SLIK" in df_slik.columns:
-        df_slik["Tanggal Hit SLIK"] = parse_dt(df_slik["Tanggal Hit SLIK"])
-    n_slik_raw = len(df_slik)
-
-    # Rename kolom bentrok
-    df_slik_j = df_slik.rename(columns={"CABANG": "CABANG_SLIK", "Product": "Product_SLIK"})
-
-    # LEFT JOIN — TANPA dedup, semua baris ikut
-    df = df_ps.merge(df_slik_j, on="APPID", how="left")
-
-    # ── STEP 4: Hitung SLA ──
-    df["_slik_found"] = df[TIMEDONE_COL].notna()
-    df["SLA_Hours"]   = (df[TIMEDONE_COL] - df["CREATED_AT"]).dt.total_seconds() / 3600
-    df["SLA_Minutes"] = df["SLA_Hours"] * 60
-    df["SLA_Hours"]   = df["SLA_Hours"].round(2)
-    df["SLA_Minutes"] = df["SLA_Minutes"].round(1)
-    df["SLA_Category"] = df["SLA_Hours"].apply(sla_category)
-    df["SLA_Display"]  = df["SLA_Hours"].apply(fmt_sla)
-
-    # Stats
-    n_match    = int(df["_slik_found"].sum())
-    n_nomatch  = int((~df["_slik_found"]).sum())
-    df_sla     = df[df["_slik_found"]].copy()   # 2,765 baris yang punya SLA
+        with profiled("preload paralel"):
+            stage_preload(escore_src, escore_col, ps_src, slik_src)
+        try:
+            with profiled("read_excel ESCORE") as p:
+                master_appids = stage_escore(escore_src, escore_col)
+                p["rows"] = len(master_appids)
+        except KeyError as e:
+            st.error(e.args[0]); st.stop()
+        n_master = len(master_appids)
+
+        # ── STEP 2: ONE ME → filter pakai master APPID, ambil CREATED_AT ──
+        with profiled("read_excel ONE ME") as p:
+            n_ps_raw_total  = stage_ps(ps_src, escore_src, escore_col).attrs["n_rows"]  # total baris ONE ME
+            p["rows"] = n_ps_raw_total
+        with profiled("filter ESCORE + STATUS") as p:
+            n_ps_escore, ps_rows, _all_status = stage_ps_rows(ps_src, escore_src, escore_col)
+            n_ps_filtered   = len(ps_rows)                                            # setelah filter status
+            p["rows"] = n_ps_filtered
+
+        # ── STEP 3: SLIK ──
+        with profiled("read_excel SLIK") as p:
+            n_slik_raw = len(stage_slik(slik_src))
+            p["rows"] = n_slik_raw
+
+        # ── STEP 4: Hitung SLA ──
+        data_key = ("files", ps_src, escore_src, escore_col, slik_src, policy, sla_mode, cal_key)
+        with profiled("merge + SLA") as p:
+            df = stage_sla(*data_key[1:])
+
+            # Stats
+            n_match    = int(df["_slik_found"].sum())
+            n_nomatch  = int((~df["_slik_found"]).sum())
+            df_sla     = stage_matched(data_key, df)   # 2,765 baris yang punya SLA
+            p["rows"] = n_match
 
 # ─────────────────────────────────────────────
 # DEBUG COUNTS — tiap step
@@ -318,52 +458,109 @@ st.markdown(f"""
 </div>
 """, unsafe_allow_html=True)
 
+# ─────────────────────────────────────────────
+# FILTER — tanggal / CABANG / PRODUK / STATUS
+# ─────────────────────────────────────────────
+# Perubahan filter cuma binary search di partisi harian + lookup posting list;
+# KPI, chart dan tabel di bawah dihitung ulang dari slice-nya saja (`view_key`).
+with profiled("index") as p:
+    idx = stage_index(data_key, df)
+    p["rows"] = len(idx["days"])
+
+with st.sidebar:
+    st.markdown("<hr style='border-color:rgba(255,255,255,0.07);margin:14px 0;'>", unsafe_allow_html=True)
+    st.markdown("**🔎 Filter Data**")
+    d0, d1 = sla_index.date_bounds(idx)
+    start = end = None
+    if d0 is not None:
+        date_range = st.date_input("Rentang CREATED_AT", (d0, d1), min_value=d0, max_value=d1)
+        # Saat baru satu tanggal yang dipilih, date_input return 1 elemen → belum difilter
+        if len(date_range) == 2 and tuple(date_range) != (d0, d1):
+            start, end = date_range
+    filters = tuple((c, tuple(st.multiselect(c, sla_index.values(idx, c))))
+                    for c in sla_index.INDEX_COLUMNS if c in idx["columns"])
+
+view_key = data_key
+if start is not None or any(vals for _, vals in filters):
+    view_key = data_key + (("filter", start, end, filters),)
+    n_rows_all = len(df)
+    with profiled("filter slice") as p:
+        df, df_sla = stage_view(data_key, start, end, filters, idx, df)
+        p["rows"] = len(df)
+    st.info(f"🔎 Filter aktif: {len(df):,} dari {n_rows_all:,} baris · {len(df_sla):,} match SLIK")
+n_view = len(df_sla)
+
 # ─────────────────────────────────────────────
 # KPI
 # ─────────────────────────────────────────────
 st.markdown('<p class="section-title">Overview SLA</p>', unsafe_allow_html=True)
-
-avg_sla    = df_sla["SLA_Hours"].mean()
-median_sla = df_sla["SLA_Hours"].median()
-min_sla    = df_sla["SLA_Hours"].min()
-max_sla    = df_sla["SLA_Hours"].max()
-cnt_ok     = int((df_sla["SLA_Hours"] <= 1).sum())
-pct_ok     = cnt_ok / n_match * 100 if n_match else 0
+if sla_mode == "business":
+    cal = stage_calendar(cal_key)
+    st.caption(f"SLA dalam jam kerja: {cal_key[0]}–{cal_key[1]}, "
+               f"{', '.join(d for d, w in zip(sla_calendar.DAY_NAMES, cal['weekmask']) if w == '1')}; "
+               f"{len(cal['holidays']):,} tanggal libur dilewati.")
+
+with profiled("rollup cube") as p:
+    cube       = stage_cube(view_key, df_sla)
+    p["rows"] = len(cube)
+with profiled("sketch kuantil") as p:
+    sketch     = stage_sketch(view_key, df_sla)
+    p["rows"] = sum(len(lv) for lv in sketch.values())
+with profiled("KPI"):
+    tot        = sla_rollup.totals(cube)
+    cats       = sla_rollup.category_counts(cube)
+    q_all      = stage_quantiles(view_key, (), sketch).iloc[0]
+
+avg_sla    = tot["avg"]
+median_sla = q_all["p50"]
+min_sla    = tot["min"]
+max_sla    = tot["max"]
+cnt_ok     = int(cats.get("≤ 1 Jam", 0))
+pct_ok     = cnt_ok / n_view * 100 if n_view else 0
 
 k1, k2, k3, k4, k5, k6 = st.columns(6)
-k1.metric("Total Aplikasi SLA", f"{n_match:,}")
+k1.metric("Total Aplikasi SLA", f"{n_view:,}")
 k2.metric("Avg SLA", fmt_sla(avg_sla))
 k3.metric("Median SLA", fmt_sla(median_sla))
 k4.metric("Min SLA", fmt_sla(min_sla))
 k5.metric("Max SLA", fmt_sla(max_sla))
 k6.metric("SLA ≤ 1 Jam", f"{cnt_ok:,}", f"{pct_ok:.1f}%")
 
+p1, p2, p3, _ = st.columns([1, 1, 1, 3])
+p1.metric("P90 SLA", fmt_sla(q_all["p90"]))
+p2.metric("P95 SLA", fmt_sla(q_all["p95"]))
+p3.metric("P99 SLA", fmt_sla(q_all["p99"]))
+
 # ─────────────────────────────────────────────
 # CHART: Distribusi + Kategori
 # ─────────────────────────────────────────────
 st.markdown('<p class="section-title">Distribusi SLA</p>', unsafe_allow_html=True)
 c1, c2 = st.columns([3, 2])
 
-with c1:
-    fig_hist = px.histogram(
-        df_sla[df_sla["SLA_Hours"] <= 48], x="SLA_Hours", nbins=40,
-        title="Distribusi SLA (jam)", color_discrete_sequence=["#60a5fa"],
-        labels={"SLA_Hours": "SLA (Jam)"}
-    )
-    fig_hist.update_layout(**PL)
+with c1, profiled("chart histogram") as p:
+    hist = sla_rollup.histogram(stage_hist(view_key, df_sla), max_hours=48, nbins=40)
+    p["rows"] = len(hist)
+    fig_hist = go.Figure(go.Bar(
+        x=((hist["left"] + hist["right"]) / 2).to_numpy(), y=hist["count"].to_numpy(),
+        width=(hist["right"] - hist["left"]).to_numpy(),
+        marker_color="#60a5fa", marker_line_width=0, name="count",
+    ))
+    fig_hist.update_layout(**PL, title="Distribusi SLA (jam)", bargap=0)
+    fig_hist.update_xaxes(title_text="SLA (Jam)")
+    fig_hist.update_yaxes(title_text="count")
     fig_hist.update_traces(opacity=0.8)
     st.plotly_chart(fig_hist, use_container_width=True)
 
-with c2:
-    cat = df_sla["SLA_Category"].value_counts().reindex(SLA_ORDER).dropna().reset_index()
-    cat.columns = ["Kategori", "Jumlah"]
+with c2, profiled("chart kategori") as p:
+    cat = cats.rename_axis("Kategori").reset_index(name="Jumlah")
+    p["rows"] = len(cat)
     fig_pie = go.Figure(go.Pie(
         labels=cat["Kategori"], values=cat["Jumlah"], hole=0.55,
         marker=dict(colors=[SLA_COLORS[k] for k in cat["Kategori"]]),
         textinfo="percent", textfont=dict(size=11),
     ))
     fig_pie.update_layout(**PL, title="Kategori SLA")
-    fig_pie.add_annotation(text=f"<b>{n_match:,}</b>", x=0.5, y=0.5, showarrow=False,
+    fig_pie.add_annotation(text=f"<b>{n_view:,}</b>", x=0.5, y=0.5, showarrow=False,
                            font=dict(size=16, color="#fff"))
     st.plotly_chart(fig_pie, use_container_width=True)
 
@@ -371,80 +568,127 @@ with c2:
 # CHART: Per Cabang
 # ─────────────────────────────────────────────
 if "CABANG" in df_sla.columns:
-    st.markdown('<p class="section-title">SLA per Cabang</p>', unsafe_allow_html=True)
-    cabang_sum = (
-        df_sla.groupby("CABANG")["SLA_Hours"]
-        .agg(Avg=lambda x: round(x.mean(), 2), Jumlah="count")
-        .reset_index().sort_values("Avg", ascending=False).head(20)
-    )
-    fig_bar = px.bar(
-        cabang_sum.sort_values("Avg"), x="Avg", y="CABANG", orientation="h",
-        title="Avg SLA per Cabang (Top 20)", color="Avg",
-        color_continuous_scale=["#34d399","#fbbf24","#f87171"],
-        text="Avg", labels={"Avg": "Avg SLA (Jam)"}
-    )
-    fig_bar.update_traces(texttemplate="%{text:.1f}h", textposition="outside", textfont_size=10)
-    fig_bar.update_layout(**PL, coloraxis_showscale=False, height=500)
-    st.plotly_chart(fig_bar, use_container_width=True)
+    with profiled("chart cabang") as p:
+        st.markdown('<p class="section-title">SLA per Cabang</p>', unsafe_allow_html=True)
+        cabang_sum = (
+            sla_rollup.group_stats(cube, "CABANG")[["CABANG", "Avg", "Count"]]
+            .rename(columns={"Count": "Jumlah"}).round({"Avg": 2})
+            .sort_values("Avg", ascending=False).head(20)
+        )
+        p["rows"] = len(cabang_sum)
+        fig_bar = px.bar(
+            cabang_sum.sort_values("Avg"), x="Avg", y="CABANG", orientation="h",
+            title="Avg SLA per Cabang (Top 20)", color="Avg",
+            color_continuous_scale=["#34d399","#fbbf24","#f87171"],
+            text="Avg", labels={"Avg": "Avg SLA (Jam)"}
+        )
+        fig_bar.update_traces(texttemplate="%{text:.1f}h", textposition="outside", textfont_size=10)
+        fig_bar.update_layout(**PL, coloraxis_showscale=False, height=500)
+        st.plotly_chart(fig_bar, use_container_width=True)
 
 # ─────────────────────────────────────────────
 # CHART: Trend Harian
 # ─────────────────────────────────────────────
-if df_sla["CREATED_AT"].notna().sum() > 0:
-    st.markdown('<p class="section-title">Trend Harian</p>', unsafe_allow_html=True)
-    daily = (
-        df_sla.assign(Tanggal=df_sla["CREATED_AT"].dt.date)
-        .groupby("Tanggal")["SLA_Hours"]
-        .agg(Avg="mean", Count="count").reset_index()
-    )
-    daily["Avg"] = daily["Avg"].round(2)
-
-    fig_trend = make_subplots(specs=[[{"secondary_y": True}]])
-    fig_trend.add_trace(go.Scatter(
-        x=daily["Tanggal"], y=daily["Avg"], name="Avg SLA",
-        line=dict(color="#60a5fa", width=2.5), mode="lines+markers",
-        marker=dict(size=5, color="#60a5fa")
-    ), secondary_y=False)
-    fig_trend.add_trace(go.Bar(
-        x=daily["Tanggal"], y=daily["Count"], name="Jumlah Aplikasi",
-        marker_color="rgba(96,165,250,0.1)", marker_line_width=0
-    ), secondary_y=True)
-    fig_trend.update_layout(**PL, title="Avg SLA & Volume Harian")
-    fig_trend.update_yaxes(title_text="Avg SLA (Jam)", secondary_y=False, gridcolor="rgba(255,255,255,0.05)")
-    fig_trend.update_yaxes(title_text="Jumlah", secondary_y=True, showgrid=False)
-    st.plotly_chart(fig_trend, use_container_width=True)
+with profiled("chart trend") as p:
+    daily, days = sla_rollup.trend(cube, max_points=120)
+    p["rows"] = len(daily)
+    if len(daily):
+        st.markdown('<p class="section-title">Trend Harian</p>', unsafe_allow_html=True)
+        x_day = daily["Tanggal"].to_numpy()
+
+        fig_trend = make_subplots(specs=[[{"secondary_y": True}]])
+        fig_trend.add_trace(go.Scatter(
+            x=x_day, y=daily["Avg"].round(2).to_numpy(), name="Avg SLA",
+            line=dict(color="#60a5fa", width=2.5), mode="lines+markers",
+            marker=dict(size=5, color="#60a5fa")
+        ), secondary_y=False)
+        fig_trend.add_trace(go.Bar(
+            x=x_day, y=daily["Count"].to_numpy(), name="Jumlah Aplikasi",
+            marker_color="rgba(96,165,250,0.1)", marker_line_width=0
+        ), secondary_y=True)
+        fig_trend.update_layout(**PL, title="Avg SLA & Volume Harian" if days == 1 else f"Avg SLA & Volume per {days} Hari")
+        fig_trend.update_yaxes(title_text="Avg SLA (Jam)", secondary_y=False, gridcolor="rgba(255,255,255,0.05)")
+        fig_trend.update_yaxes(title_text="Jumlah", secondary_y=True, showgrid=False)
+        st.plotly_chart(fig_trend, use_container_width=True)
+
+def detail_table(df, table, sort_col=None):
+    """Filter APPID/CABANG, sort & paging di server — yang dikirim ke browser cuma satu halaman."""
+    f1, f2, f3 = st.columns([3, 1, 1])
+    query = f1.text_input("Cari APPID / CABANG", key=f"{table}_q",
+                          help="Angka = awalan APPID; teks = bagian nama CABANG")
+    order = None
+    if sort_col:
+        desc  = f2.selectbox(f"Urut {sort_col}", ["Terbesar", "Terkecil"], key=f"{table}_sort") == "Terbesar"
+        order = stage_order(view_key, table, sort_col, not desc, df)
+    size  = f3.selectbox("Baris / halaman", [50, 100, 500, 1000], index=1, key=f"{table}_size")
+    mask  = stage_search(view_key, table, query, df)
+    n     = len(df) if mask is None else int(mask.sum())
+    n_pages = max(1, -(-n // size))
+    if st.session_state.get(f"{table}_page", 1) > n_pages:
+        st.session_state[f"{table}_page"] = 1
+    page_no = st.number_input(f"Halaman (dari {n_pages:,})", min_value=1, max_value=n_pages, key=f"{table}_page")
+    with profiled(f"tabel {table}") as p:
+        view, n, _ = sla_export.page(df, page_no, size, order, mask)
+        st.dataframe(view, use_container_width=True, hide_index=True)
+        p["rows"] = len(view)
+    st.caption(f"{n:,} baris cocok · menampilkan {len(view):,}")
+
+
+def export_button(label, sheets, base, table):
+    """Download dibuat saat tombol diklik (callable), bukan setiap rerun."""
+    e1, e2 = st.columns([1, 4])
+    fmt = e1.selectbox("Format", list(sla_export.EXPORT_FORMATS), key=f"{table}_fmt", label_visibility="collapsed")
+    ext, mime = sla_export.EXPORT_FORMATS[fmt]
+    what = "semua sheet" if ext == "xlsx" and len(sheets) > 1 else label
+
+    def build():
+        # Jalan saat diklik, setelah panel profiling dirender → cukup masuk log
+        with sla_profile.step(None, f"export {base}.{ext}") as p:
+            data = sla_export.export_file(sheets, fmt)
+            p["rows"] = sum(len(d) for d in sheets.values()) if ext == "xlsx" else len(next(iter(sheets.values())))
+        return data
+
+    e2.download_button(f"⬇️ Download {what} ({fmt})", build,
+                       f"{base}.{ext}", mime, on_click="ignore", key=f"{table}_dl")
+
 
 # ─────────────────────────────────────────────
 # TABEL
 # ─────────────────────────────────────────────
 st.markdown('<p class="section-title">Detail Data</p>', unsafe_allow_html=True)
 
+per_appid = sla_per_appid(df_sla)
+no_match  = df[~df["_slik_found"]][["APPID","USER_NAM","CREATED_AT","CABANG","PRODUK","STATUS"] if "STATUS" in df.columns else ["APPID","CREATED_AT","CABANG"]]
+no_match  = no_match[[c for c in no_match.columns if c in df.columns]]
+
 tab1, tab2, tab3, tab4 = st.tabs(["SLA per APPID", "Summary per Cabang", "Duplikat APPID", "Tidak Match SLIK"])
 
 with tab1:
-    show = ["APPID","USER_NAM","CREATED_AT","CABANG","PRODUK",TIMEDONE_COL,"SLA_Display","SLA_Hours","SLA_Category"]
-    show = [c for c in show if c in df_sla.columns]
-    st.dataframe(df_sla[show].sort_values("SLA_Hours", ascending=False), use_container_width=True, hide_index=True)
-    csv1 = df_sla[show].to_csv(index=False).encode()
-    st.download_button("⬇️ Download SLA per APPID", csv1, "sla_per_appid.csv", "text/csv")
+    detail_table(per_appid, "sla_per_appid", sort_col="SLA_Hours")
+    sheets1 = {"SLA per APPID": per_appid}
+    if "CABANG" in df_sla.columns:
+        sheets1["Summary Cabang"] = sla_rollup.summary(cube, "CABANG", stage_quantiles(view_key, ("CABANG",), sketch))
+    sheets1["Tidak Match SLIK"] = no_match
+    export_button("SLA per APPID", sheets1, "sla_per_appid", "sla_per_appid")
 
 with tab2:
     if "CABANG" in df_sla.columns:
-        summ = (
-            df_sla.groupby("CABANG")["SLA_Hours"]
-            .agg(Total="count", Avg=lambda x: round(x.mean(),2),
-                 Median=lambda x: round(x.median(),2),
-                 Min=lambda x: round(x.min(),2), Max=lambda x: round(x.max(),2))
-            .reset_index().sort_values("Avg", ascending=False)
-        )
+        summ_by = st.radio("Summary per", ["CABANG", "PRODUK", "Tanggal"], horizontal=True)
+        with profiled(f"summary {summ_by}") as p:
+            summ = sla_rollup.summary(cube, summ_by, stage_quantiles(view_key, (summ_by,), sketch))
+            p["rows"] = len(summ)
         st.dataframe(summ, use_container_width=True, hide_index=True)
-        csv2 = summ.to_csv(index=False).encode()
-        st.download_button("⬇️ Download Summary Cabang", csv2, "summary_cabang.csv", "text/csv")
+        with profiled(f"csv summary_{summ_by.lower()}") as p:
+            csv2 = summ.to_csv(index=False).encode()
+            p["rows"] = len(summ)
+        st.download_button(f"⬇️ Download Summary {summ_by}", csv2, f"summary_{summ_by.lower()}.csv", "text/csv")
 
 with tab3:
     # Tabel yang menunjukkan APPID dengan lebih dari 1 baris (duplikat)
     st.caption("APPID yang muncul lebih dari 1 kali di hasil join — ini yang akan hilang kalau pakai dedup")
-    dup_appids = df_sla[df_sla.duplicated(subset=["APPID"], keep=False)].sort_values("APPID")
+    with profiled("duplikat APPID") as p:
+        dup_appids = duplicate_rows(df_sla)
+        p["rows"] = len(dup_appids)
     show_dup = ["APPID","USER_NAM","CREATED_AT","CABANG",TIMEDONE_COL,"SLA_Display","SLA_Hours","SLA_Category"]
     show_dup = [c for c in show_dup if c in dup_appids.columns]
     if len(dup_appids):
@@ -453,18 +697,37 @@ with tab3:
 
         # Perbandingan: dengan dedup vs tanpa dedup
         st.markdown("**Perbandingan hasil jika pakai dedup (ambil SLA terkecil per APPID):**")
-        df_dedup = df_sla.sort_values("SLA_Hours").drop_duplicates(subset=["APPID"], keep="first")
+        with profiled("dedup SLA terkecil") as p:
+            df_dedup = dedup_min_sla(df_sla)
+            p["rows"] = len(df_dedup)
         col_a, col_b = st.columns(2)
-        col_a.metric("Tanpa Dedup (sekarang)", f"{len(df_sla):,} baris", f"Avg: {fmt_sla(df_sla['SLA_Hours'].mean())}")
+        col_a.metric("Tanpa Dedup (sekarang)" if policy == "all" else JOIN_POLICIES[policy], f"{len(df_sla):,} baris", f"Avg: {fmt_sla(df_sla['SLA_Hours'].mean())}")
         col_b.metric("Dengan Dedup", f"{len(df_dedup):,} baris", f"Avg: {fmt_sla(df_dedup['SLA_Hours'].mean())}")
     else:
         st.success("Tidak ada duplikat APPID — semua APPID unik.")
 
 with tab4:
     st.caption("APPID yang ada di ONE ME tapi tidak ketemu di SLIK")
-    no_match = df[~df["_slik_found"]][["APPID","USER_NAM","CREATED_AT","CABANG","PRODUK","STATUS"] if "STATUS" in df.columns else ["APPID","CREATED_AT","CABANG"]]
-    no_match = no_match[[c for c in no_match.columns if c in df.columns]]
     st.info(f"{len(no_match):,} baris tidak match ke SLIK")
-    st.dataframe(no_match, use_container_width=True, hide_index=True)
-    csv4 = no_match.to_csv(index=False).encode()
-    st.download_button("⬇️ Download Tidak Match", csv4, "tidak_match_slik.csv", "text/csv")
+    detail_table(no_match, "tidak_match")
+    export_button("Tidak Match", {"Tidak Match SLIK": no_match}, "tidak_match_slik", "tidak_match")
+
+# ─────────────────────────────────────────────
+# PROFILING
+# ─────────────────────────────────────────────
+# Biaya rerun ini per step (stage yang kena cache Streamlit ≈ 0). Record yang
+# sama juga ditulis ke logger "sla.profile" sebagai satu baris JSON per step.
+with st.expander("⏱️ Profiling tiap step", expanded=False):
+    prof_df = pd.DataFrame(prof, columns=sla_profile.COLUMNS)
+    total_wall = prof_df["wall_s"].sum()
+    st.caption(f"Total {total_wall:.3f} s wall · {prof_df['cpu_s'].sum():.3f} s CPU · "
+               f"{len(prof):,} step" + ("" if trace_mem else " · peak_mb aktif kalau 'Profil memori' dicentang"))
+    st.dataframe(prof_df.assign(pct=(prof_df["wall_s"] / total_wall * 100 if total_wall else 0).round(1)),
+                 use_container_width=True, hide_index=True)
+    cs = sla_shared.stats()
+    st.caption(f"Cache bersama (semua sesi): {cs['entries']:,} entry · {cs['bytes'] / 2**20:,.1f} / "
+               f"{cs['budget'] / 2**20:,.0f} MB · hit {cs['hits']:,} · miss {cs['misses']:,} · "
+               f"evict {cs['evicted']:,} · invalidasi {cs['invalidated']:,}")
+    j1, j2, _ = st.columns([1, 1, 3])
+    j1.download_button("⬇️ JSON", sla_profile.to_json(prof), "sla_profile.json", "application/json")
+    j2.download_button("⬇️ Log lines", sla_profile.log_lines(prof), "sla_profile.jsonl", "text/plain")
@@ -0,0 +1,308 @@
+"""
+Store SLA lokal (SQLite) untuk mode incremental.
+
+Baris ONE ME, SLIK dan master ESCORE disimpan di SQLite beserta hasil join +
+SLA_Hours. File baru (delta harian) di-upsert; hanya APPID yang barisnya baru
+atau berubah yang di-join ulang — termasuk APPID yang sebelumnya "Tidak Match
+SLIK" dan sekarang hit SLIK-nya sudah masuk. Dashboard/CLI lalu baca hasil
+dari store, bukan dari ketiga workbook.
+
+Baris ONE ME di-key per isi baris penuh (APPID, CREATED_AT, USER_NAM, STATUS,
+CABANG, PRODUK) plus kolom `n` = berapa kali baris itu muncul. Duplikat di
+dalam satu file tetap dihitung semua (sama dengan mode file yang TANPA dedup);
+file delta yang memuat baris yang sudah ada tidak menambah n (n = maks antar
+file), jadi ekstrak yang saling tumpang tindih tidak dobel. Baris yang isinya
+berubah (mis. STATUS) masuk sebagai baris baru.
+
+APPID yang perlu di-join ulang dicatat di tabel `aff` dalam transaksi yang sama
+dengan upsert + tanda file sudah di-ingest, dan baru dihapus dalam transaksi
+yang menulis ulang `sla`. Kalau proses mati / join gagal di tengah, antrean itu
+tetap ada dan sync() berikutnya menyelesaikannya lebih dulu.
+
+    python sla_store.py sla_store.sqlite --ps "ONE ME delta.xlsx" --slik "SLIK delta.xlsx"
+"""
+import argparse
+import datetime
+import sqlite3
+import sys
+
+import pandas as pd
+
+from sla_cache import file_fingerprint
+from sla_engine import (
+    SHEET_ESCORE, SHEET_PS, SHEET_SLIK, ESCORE_COL, TIMEDONE_COL,
+    apply_schema, compute_sla, fmt_sla_series, join_slik, load_master_appids, load_ps, load_slik,
+    sla_category, status_ok,
+)
+
+DEFAULT_STORE = "sla_store.sqlite"
+
+# kolom engine ↔ kolom SQLite (timestamp disimpan sebagai epoch mikrodetik — masih
+# exact kalau lewat float64, jadi aman dibaca balik oleh read_sql yang ada NULL-nya)
+_TS_COLS = {"CREATED_AT": "created_us", "Tanggal Hit SLIK": "hit_us", TIMEDONE_COL: "done_us"}
+_PS_TEXT = ["USER_NAM", "STATUS", "CABANG", "PRODUK"]
+_EPOCH   = pd.Timestamp("1970-01-01")
+# Key baris ONE ME = isi baris penuh (NULL disamakan lewat COALESCE, char(0) tidak muncul di data)
+_PS_ROW  = "APPID, COALESCE(created_us, -1), " + ", ".join(f"COALESCE({c}, char(0))" for c in _PS_TEXT)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS master (APPID INTEGER PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS ps (
+    APPID INTEGER NOT NULL, USER_NAM TEXT, STATUS TEXT, created_us INTEGER,
+    CABANG TEXT, PRODUK TEXT, status_ok INTEGER NOT NULL, n INTEGER NOT NULL DEFAULT 1
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ps_row ON ps({_PS_ROW});
+CREATE TABLE IF NOT EXISTS slik (APPID INTEGER NOT NULL, hit_us INTEGER, done_us INTEGER);
+CREATE UNIQUE INDEX IF NOT EXISTS slik_key ON slik(APPID, COALESCE(hit_us, -1), COALESCE(done_us, -1));
+CREATE TABLE IF NOT EXISTS sla (
+    APPID INTEGER NOT NULL, USER_NAM TEXT, STATUS TEXT, created_us INTEGER,
+    CABANG TEXT, PRODUK TEXT, hit_us INTEGER, done_us INTEGER,
+    SLA_Hours REAL, SLA_Minutes REAL
+);
+CREATE INDEX IF NOT EXISTS sla_appid ON sla(APPID);
+CREATE TABLE IF NOT EXISTS sources (
+    kind TEXT, sha256 TEXT, sheet TEXT, variant TEXT, path TEXT, n_rows INTEGER, ingested_at TEXT,
+    PRIMARY KEY (kind, sha256, sheet, variant)
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS aff (APPID INTEGER PRIMARY KEY);
+"""
+
+
+def _migrate(con):
+    """Store lama (ps di-key APPID + CREATED_AT, tanpa n): duplikat sudah hilang → ingest ulang file ONE ME."""
+    cols = [r[1] for r in con.execute("PRAGMA table_info(ps)")]
+    if cols and "n" not in cols:
+        with con:
+            con.execute("DROP INDEX IF EXISTS ps_key")
+            con.execute("ALTER TABLE ps ADD COLUMN n INTEGER NOT NULL DEFAULT 1")
+            con.execute("DELETE FROM sources WHERE kind = 'ps'")
+
+
+def open_store(path=DEFAULT_STORE):
+    con = sqlite3.connect(path)
+    _migrate(con)
+    con.executescript(_SCHEMA)
+    return con
+
+
+def store_version(con):
+    """Counter yang naik tiap kali isi store berubah — dipakai sebagai key cache."""
+    row = con.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+    return int(row[0]) if row else 0
+
+
+def _bump_version(con):
+    con.execute("INSERT INTO meta VALUES ('version', '1') "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1")
+
+
+def _to_us(s):
+    return ((s - _EPOCH) // pd.Timedelta(microseconds=1)).astype("Int64")
+
+
+def _from_us(s):
+    # Lewat int64 → datetime64 langsung; pd.to_datetime(unit=) pakai jalur float yang bisa overflow di NaN
+    v  = s.astype("Int64")
+    dt = pd.Series(v.fillna(0).to_numpy("int64").astype("datetime64[us]"), index=s.index).astype("datetime64[ns]")
+    return dt.where(v.notna())
+
+
+def _already_ingested(con, kind, fp, sheet, variant):
+    return con.execute(
+        "SELECT 1 FROM sources WHERE kind = ? AND sha256 = ? AND sheet = ? AND variant = ?",
+        (kind, fp["sha256"], sheet, variant),
+    ).fetchone() is not None
+
+
+def _mark_ingested(con, kind, fp, sheet, variant, n_rows):
+    con.execute(
+        "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (kind, fp["sha256"], sheet, variant, fp["path"], n_rows,
+         datetime.datetime.now().isoformat(timespec="seconds")),
+    )
+
+# ─────────────────────────────────────────────
+# INGEST
+# ─────────────────────────────────────────────
+def ingest_escore(con, path, sheet=SHEET_ESCORE, col=ESCORE_COL):
+    """Tambah master APPID baru. Return jumlah APPID baru."""
+    fp = file_fingerprint(path)
+    if _already_ingested(con, "escore", fp, sheet, col):
+        return 0
+    appids = pd.DataFrame({"APPID": sorted(load_master_appids(path, sheet, col))})
+    with con:
+        appids.to_sql("_delta", con, if_exists="replace", index=False)
+        con.execute("INSERT OR IGNORE INTO aff SELECT d.APPID FROM _delta d "
+                    "LEFT JOIN master m USING (APPID) WHERE m.APPID IS NULL")
+        con.execute("INSERT OR IGNORE INTO master SELECT APPID FROM _delta")
+        con.execute("DROP TABLE _delta")
+        _mark_ingested(con, "escore", fp, sheet, col, len(appids))
+    return _refresh(con)
+
+
+def ingest_ps(con, path, sheet=SHEET_PS):
+    """Upsert baris ONE ME (semua status, semua APPID). Return jumlah APPID yang di-join ulang."""
+    fp = file_fingerprint(path)
+    if _already_ingested(con, "ps", fp, sheet, ""):
+        return 0
+    df = load_ps(path, sheet)
+    df = df[df["APPID"].notna()]
+    delta = pd.DataFrame({"APPID": df["APPID"].astype("int64")})
+    for c in _PS_TEXT:
+        delta[c] = df[c] if c in df.columns else None
+    delta["created_us"] = _to_us(df["CREATED_AT"])
+    delta["status_ok"]  = status_ok(df["STATUS"]).astype(int) if "STATUS" in df.columns else 1
+    # Baris identik digabung jadi satu baris + n (jumlah kemunculan di file ini)
+    g = delta.groupby(["APPID", "created_us"] + _PS_TEXT, dropna=False, sort=False, observed=True)
+    delta = g["status_ok"].first().to_frame().assign(n=g.size()).reset_index()
+    same = " AND ".join(f"p.{c} IS d.{c}" for c in ["created_us"] + _PS_TEXT)
+    with con:
+        delta.to_sql("_delta", con, if_exists="replace", index=False)
+        con.execute(
+            "INSERT OR IGNORE INTO aff SELECT DISTINCT d.APPID FROM _delta d "
+            f"LEFT JOIN ps p ON p.APPID = d.APPID AND {same} "
+            "WHERE p.APPID IS NULL OR p.n < d.n"
+        )
+        con.execute("INSERT INTO ps (APPID, USER_NAM, STATUS, created_us, CABANG, PRODUK, status_ok, n) "
+                    "SELECT APPID, USER_NAM, STATUS, created_us, CABANG, PRODUK, status_ok, n FROM _delta WHERE true "
+                    f"ON CONFLICT({_PS_ROW}) DO UPDATE SET n = MAX(n, excluded.n)")
+        con.execute("DROP TABLE _delta")
+        _mark_ingested(con, "ps", fp, sheet, "", int(delta["n"].sum()))
+    return _refresh(con)
+
+
+def ingest_slik(con, path, sheet=SHEET_SLIK):
+    """Tambah hit SLIK baru. Return jumlah APPID yang di-join ulang."""
+    fp = file_fingerprint(path)
+    if _already_ingested(con, "slik", fp, sheet, ""):
+        return 0
+    df = load_slik(path, sheet)
+    df = df[df["APPID"].notna()]
+    delta = pd.DataFrame({"APPID": df["APPID"].astype("int64")})
+    delta["hit_us"]  = _to_us(df["Tanggal Hit SLIK"]) if "Tanggal Hit SLIK" in df.columns else None
+    delta["done_us"] = _to_us(df[TIMEDONE_COL])
+    with con:
+        delta.to_sql("_delta", con, if_exists="replace", index=False)
+        con.execute(
+            "INSERT OR IGNORE INTO aff SELECT DISTINCT d.APPID FROM _delta d "
+            "LEFT JOIN slik s ON s.APPID = d.APPID AND COALESCE(s.hit_us, -1) = COALESCE(d.hit_us, -1) "
+            "AND COALESCE(s.done_us, -1) = COALESCE(d.done_us, -1) WHERE s.APPID IS NULL"
+        )
+        con.execute("INSERT OR IGNORE INTO slik (APPID, hit_us, done_us) SELECT APPID, hit_us, done_us FROM _delta")
+        con.execute("DROP TABLE _delta")
+        _mark_ingested(con, "slik", fp, sheet, "", len(delta))
+    return _refresh(con)
+
+
+def _refresh(con):
+    """Join ulang + hitung SLA hanya untuk APPID di aff; tulis sla + kosongkan aff dalam satu transaksi."""
+    n_aff = con.execute("SELECT COUNT(*) FROM aff").fetchone()[0]
+    if not n_aff:
+        return 0
+    df_ps = pd.read_sql_query(
+        "SELECT p.APPID, p.USER_NAM, p.STATUS, p.created_us, p.CABANG, p.PRODUK, p.n FROM ps p "
+        "JOIN aff USING (APPID) JOIN master USING (APPID) WHERE p.status_ok = 1", con)
+    df_ps = df_ps.loc[df_ps.index.repeat(df_ps.pop("n"))].reset_index(drop=True)
+    df_slik = pd.read_sql_query(
+        "SELECT s.APPID, s.hit_us, s.done_us FROM slik s JOIN aff USING (APPID)", con)
+    for col, us in _TS_COLS.items():
+        for d in (df_ps, df_slik):
+            if us in d.columns:
+                d[col] = _from_us(d.pop(us))
+
+    df = compute_sla(join_slik(df_ps, df_slik))
+    out = pd.DataFrame({"APPID": df["APPID"]})
+    for c in _PS_TEXT:
+        out[c] = df[c]
+    for col, us in _TS_COLS.items():
+        out[us] = _to_us(df[col])
+    out["SLA_Hours"]   = df["SLA_Hours"]
+    out["SLA_Minutes"] = df["SLA_Minutes"]
+    # executemany, bukan to_sql: to_sql commit sendiri di tengah transaksi
+    rows = out.astype(object).where(out.notna(), None).itertuples(index=False, name=None)
+    with con:
+        con.execute("DELETE FROM sla WHERE APPID IN (SELECT APPID FROM aff)")
+        con.executemany(f"INSERT INTO sla ({', '.join(out.columns)}) VALUES ({', '.join('?' * len(out.columns))})", rows)
+        con.execute("DELETE FROM aff")
+        _bump_version(con)
+    return n_aff
+
+
+def sync(con, escore=None, ps=None, slik=None):
+    """
+    Ingest (path, sheet[, col]) yang diberikan — file yang sha256-nya sudah pernah
+    masuk dilewati. Antrean aff sisa sync yang gagal diselesaikan dulu.
+    Return jumlah APPID yang di-join ulang.
+    """
+    n = _refresh(con)
+    if escore:
+        n += ingest_escore(con, *escore)
+    if ps:
+        n += ingest_ps(con, *ps)
+    if slik:
+        n += ingest_slik(con, *slik)
+    return n
+
+# ─────────────────────────────────────────────
+# READ
+# ─────────────────────────────────────────────
+def load_result(con):
+    """Hasil dari store dalam bentuk yang sama dengan sla_engine.run_pipeline()."""
+    df = pd.read_sql_query(
+        "SELECT APPID, USER_NAM, STATUS, created_us, CABANG, PRODUK, hit_us, done_us, SLA_Hours, SLA_Minutes "
+        "FROM sla ORDER BY created_us, APPID", con)
+    for col, us in _TS_COLS.items():
+        df[col] = _from_us(df.pop(us))
+    # kolom yang isinya NULL semua (mis. belum ada hit SLIK) dibaca read_sql sebagai object
+    df[["SLA_Hours", "SLA_Minutes"]] = df[["SLA_Hours", "SLA_Minutes"]].astype(float)
+    apply_schema(df)
+    df["_slik_found"]  = df[TIMEDONE_COL].notna()
+    df["SLA_Category"] = sla_category(df["SLA_Hours"])
+    df["SLA_Display"]  = fmt_sla_series(df["SLA_Hours"])
+
+    one = lambda sql: con.execute(sql).fetchone()[0]
+    counts = {
+        "n_master":       one("SELECT COUNT(*) FROM master"),
+        "n_ps_raw_total": one("SELECT COALESCE(SUM(n), 0) FROM ps"),
+        "n_ps_escore":    one("SELECT COALESCE(SUM(n), 0) FROM ps JOIN master USING (APPID)"),
+        "n_ps_filtered":  one("SELECT COALESCE(SUM(n), 0) FROM ps JOIN master USING (APPID) WHERE status_ok = 1"),
+        "n_slik_raw":     one("SELECT COUNT(*) FROM slik"),
+        "n_match":        int(df["_slik_found"].sum()),
+        "n_nomatch":      int((~df["_slik_found"]).sum()),
+    }
+    all_status = [r[0] for r in con.execute(
+        "SELECT DISTINCT STATUS FROM ps JOIN master USING (APPID) WHERE STATUS IS NOT NULL")]
+    return {"df": df, "df_sla": df[df["_slik_found"]], "all_status": all_status, "counts": counts}
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Ingest delta ESCORE / ONE ME / SLIK ke store SLA incremental.")
+    p.add_argument("store", nargs="?", default=DEFAULT_STORE)
+    p.add_argument("--escore")
+    p.add_argument("--ps")
+    p.add_argument("--slik")
+    p.add_argument("--escore-sheet", default=SHEET_ESCORE)
+    p.add_argument("--ps-sheet", default=SHEET_PS)
+    p.add_argument("--slik-sheet", default=SHEET_SLIK)
+    p.add_argument("--escore-col", default=ESCORE_COL)
+    args = p.parse_args(argv)
+
+    con = open_store(args.store)
+    try:
+        n = sync(
+            con,
+            escore=(args.escore, args.escore_sheet, args.escore_col) if args.escore else None,
+            ps=(args.ps, args.ps_sheet) if args.ps else None,
+            slik=(args.slik, args.slik_sheet) if args.slik else None,
+        )
+        c = load_result(con)["counts"]
+    finally:
+        con.close()
+    print(f"{n:,} APPID di-join ulang. Store: ESCORE {c['n_master']:,} → ONE ME {c['n_ps_filtered']:,} "
+          f"→ SLIK match {c['n_match']:,} / tidak {c['n_nomatch']:,}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
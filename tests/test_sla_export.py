@@ -0,0 +1,39 @@
+"""Regresi sla_export: hasil export_file harus bisa langsung dipakai st.download_button."""
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sla_export  # noqa: E402
+
+
+def _sheets():
+    df = pd.DataFrame({
+        "APPID":     ["1", "2", "3"],
+        "CABANG":    pd.Categorical(["A", None, "B"]),
+        "SLA_Hours": [0.5, np.nan, 12.0],
+    })
+    return {"SLA per APPID": df, "Lain": df.head(1)}
+
+
+@pytest.mark.parametrize("fmt", list(sla_export.EXPORT_FORMATS))
+def test_export_file_accepted_by_download_button(fmt):
+    data, _ = convert_data_to_bytes_and_infer_mime(
+        sla_export.export_file(_sheets(), fmt), RuntimeError("unsupported type"))
+    ext = sla_export.EXPORT_FORMATS[fmt][0]
+    if ext == "csv":
+        out = pd.read_csv(io.BytesIO(data))
+    elif ext == "parquet":
+        out = pd.read_parquet(io.BytesIO(data))
+    else:
+        book = pd.read_excel(io.BytesIO(data), sheet_name=None)
+        assert list(book) == ["SLA per APPID", "Lain"]
+        out = book["SLA per APPID"]
+    assert out.shape == (3, 3)
+    assert out["CABANG"].isna().tolist() == [False, True, False]
@@ -0,0 +1,66 @@
+"""Regresi sla_sketch: df_sla tanpa SLA_Hours valid tidak boleh bikin query kuantil crash."""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sla_sketch  # noqa: E402
+
+P_COLS = ["p50", "p90", "p95", "p99"]
+
+
+def _df_sla(hours):
+    n = len(hours)
+    return pd.DataFrame({
+        "CREATED_AT": pd.date_range("2025-01-01 08:00", periods=n, freq="37min"),
+        "CABANG":     pd.Categorical(["A", "B", "C"] * (n // 3) + ["A"] * (n % 3)),
+        "PRODUK":     ["X", "Y"] * (n // 2) + ["X"] * (n % 2),
+        "SLA_Hours":  np.asarray(hours, dtype=float),
+    })
+
+
+def _check_empty(df_sla):
+    sketch = sla_sketch.build(df_sla)
+    total = sla_sketch.quantiles(sketch).iloc[0]        # dipakai KPI dashboard
+    assert list(total.index) == P_COLS
+    assert total.isna().all()
+    for lv in sla_sketch.LEVELS[1:]:
+        q = sla_sketch.quantiles(sketch, lv)
+        assert list(q.columns) == list(lv) + P_COLS
+        assert q.empty
+
+
+def test_empty_df_sla():
+    _check_empty(_df_sla([]))
+
+
+def test_all_nan_df_sla():
+    _check_empty(_df_sla([np.nan] * 30))
+
+
+def test_levels_match_exact_quantiles():
+    rng = np.random.default_rng(0)
+    df = _df_sla(rng.exponential(2.0, 3000))
+    sketch = sla_sketch.build(df)
+    total = sla_sketch.quantiles(sketch).iloc[0]
+    exact = np.quantile(df["SLA_Hours"], [0.5, 0.9, 0.95, 0.99])
+    assert np.allclose(total[P_COLS].to_numpy(float), exact, rtol=0.05)
+    by_cabang = sla_sketch.quantiles(sketch, ["CABANG"]).set_index("CABANG")["p95"]
+    ex_cabang = df.groupby("CABANG", observed=True)["SLA_Hours"].quantile(0.95)
+    assert np.allclose(by_cabang.sort_index(), ex_cabang.sort_index(), rtol=0.05)
+
+
+def test_small_groups_match_pandas_linear_quantile():
+    # Grup kecil (centroid singleton semua) harus exact, termasuk ekor p90/p99
+    rng = np.random.default_rng(1)
+    df = _df_sla(np.round(rng.exponential(5.0, 14), 2))
+    df["CABANG"] = pd.Categorical(["A"] * 5 + ["B"] * 2 + ["C"] + ["D"] * 6)
+    df.loc[df["CABANG"] == "A", "SLA_Hours"] = [0.1, 0.2, 0.3, 0.4, 40.0]
+    sketch = sla_sketch.build(df)
+    got = sla_sketch.quantiles(sketch, ["CABANG"]).set_index("CABANG").sort_index()
+    exact = df.groupby("CABANG", observed=True)["SLA_Hours"].quantile([0.5, 0.9, 0.95, 0.99]).unstack()
+    assert np.allclose(got[P_COLS].to_numpy(float), exact.sort_index().to_numpy(float))
+    assert got.loc["A", "p90"] < 40.0